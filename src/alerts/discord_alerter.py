@@ -1,11 +1,18 @@
-import json
+import queue
+import threading
 import time
 from dataclasses import dataclass
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
+import orjson
 import requests
 
 
+# Match the leniency of stdlib json: non-str keys are stringified, and types
+# orjson cannot encode natively fall back to str().
+_PAYLOAD_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
 @dataclass
 class AlertMessage:
     kind: str
@@ -17,29 +24,87 @@ class DiscordAlerter:
         self.webhook_url = webhook_url
         self.throttle_sec = throttle_sec
         self.batch_size = batch_size
-        self.buffer: List[AlertMessage] = []
+        self.queue: "queue.Queue[Optional[AlertMessage]]" = queue.Queue()
         self.last_sent = 0.0
         self.session = requests.Session()
+        self._closing = threading.Event()
+        # Webhook posts happen on this thread so a slow Discord never stalls the trading loop.
+        self._worker = threading.Thread(target=self._send_loop, daemon=True)
+        self._worker.start()
 
     def enqueue(self, kind: str, payload: Dict[str, Any]) -> None:
-        self.buffer.append(AlertMessage(kind=kind, payload=payload))
+        self.queue.put(AlertMessage(kind=kind, payload=payload))
+
+    def close(self, timeout: float = 5.0) -> None:
+        # Wakes the worker from its throttle wait so the backlog drains right away.
+        self._closing.set()
+        self.queue.put(None)
+        self._worker.join(timeout=timeout)
+
+    def _send_loop(self) -> None:
+        while True:
+            msg = self.queue.get()
+            if msg is None:
+                return
+            wait = self.throttle_sec - (time.time() - self.last_sent)
+            if wait > 0:
+                self._closing.wait(wait)
+            batch = [msg]
+            stopping = False
+            while len(batch) < self.batch_size:
+                try:
+                    msg = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if msg is None:
+                    stopping = True
+                    break
+                batch.append(msg)
+            try:
+                self._send(batch)
+            except Exception as e:
+                # Never let one bad batch kill the worker and strand every later alert.
+                print(f"[WARN] Discord alert batch dropped: {e}")
+            if stopping:
+                return
 
-    def flush(self) -> None:
+    def _send(self, batch: List[AlertMessage]) -> None:
         now = time.time()
-        if not self.buffer:
-            return
-        if now - self.last_sent < self.throttle_sec:
-            return
-        batch = self.buffer[: self.batch_size]
-        self.buffer = self.buffer[self.batch_size :]
-        content = "\n".join([self._format_message(msg) for msg in batch])
         if not self.webhook_url:
             self.last_sent = now
             return
-        response = self.session.post(self.webhook_url, json={"content": content}, timeout=10)
-        response.raise_for_status()
+        body = self._build_body(batch)
+        if body is None:
+            return
+        try:
+            response = self.session.post(
+                self.webhook_url,
+                data=body,
+                headers={"Content-Type": "application/json"},
+                timeout=10,
+            )
+            response.raise_for_status()
+        except requests.RequestException as e:
+            print(f"[WARN] Discord alert failed: {e}")
         self.last_sent = now
 
-    def _format_message(self, msg: AlertMessage) -> str:
-        payload = json.dumps(msg.payload, ensure_ascii=False)
-        return f"[{msg.kind}] {payload}"
+    def _build_body(self, batch: List[AlertMessage]) -> Optional[bytes]:
+        # Lines are assembled as UTF-8 bytes and the envelope is encoded once,
+        # so requests does not serialize the body a second time.
+        content = bytearray()
+        for msg in batch:
+            # Serialized one by one so an unencodable payload only drops itself.
+            try:
+                line = orjson.dumps(msg.payload, option=_PAYLOAD_OPTIONS, default=str)
+            except orjson.JSONEncodeError as e:
+                print(f"[WARN] Dropping {msg.kind} alert: {e}")
+                continue
+            if content:
+                content += b"\n"
+            content += b"["
+            content += msg.kind.encode("utf-8")
+            content += b"] "
+            content += line
+        if not content:
+            return None
+        return orjson.dumps({"content": content.decode("utf-8")})
@@ -1,6 +1,7 @@
 from dataclasses import dataclass
-from datetime import datetime
-from typing import Dict, Iterable, List
+from typing import Iterable, Sequence, Tuple
+
+import numpy as np
 
 from src.data.storage import SqliteStorage
 
@@ -12,59 +13,42 @@ class BacktestResult:
     hit_rate: float
 
 
-def compute_drawdown(equity_curve: List[float]) -> float:
-    peak = equity_curve[0] if equity_curve else 0.0
-    max_dd = 0.0
-    for value in equity_curve:
-        if value > peak:
-            peak = value
-        drawdown = peak - value
-        if drawdown > max_dd:
-            max_dd = drawdown
-    return max_dd
+def compute_drawdown(equity_curve: Sequence[float]) -> float:
+    equity = np.asarray(equity_curve, dtype=np.float64)
+    if equity.size == 0:
+        return 0.0
+    return float((np.maximum.accumulate(equity) - equity).max())
 
 
-def replay_fills(storage: SqliteStorage, market: str) -> Iterable[Dict[str, str]]:
-    cursor = storage.connection.cursor()
-    cursor.execute(
+def replay_fills(storage: SqliteStorage, market: str) -> Iterable[Tuple[str, float, float, int]]:
+    cursor = storage.connection.execute(
         "SELECT order_id, price, size, timestamp FROM fills WHERE market = ? ORDER BY timestamp ASC",
         (market,),
     )
-    columns = [desc[0] for desc in cursor.description]
-    for row in cursor.fetchall():
-        yield dict(zip(columns, row))
+    # Stream (order_id, price, size, timestamp) rows straight off the cursor.
+    yield from cursor
 
 
 def backtest(storage_path: str, market: str) -> BacktestResult:
     storage = SqliteStorage(storage_path)
-    pnl = 0.0
-    equity_curve = [0.0]
-    hits = 0
-    total = 0
-    position = 0.0
-    average_price = 0.0
-
-    for fill in replay_fills(storage, market):
-        size = float(fill["size"])
-        price = float(fill["price"])
-        total += 1
-        if position == 0:
-            position = size
-            average_price = price
-            continue
-        pnl_change = (price - average_price) * position
-        pnl += pnl_change
-        equity_curve.append(pnl)
-        if pnl_change > 0:
-            hits += 1
-        position += size
-        average_price = price
-
-    hit_rate = hits / total if total else 0.0
-    result = BacktestResult(
-        total_pnl=pnl,
-        max_drawdown=compute_drawdown(equity_curve),
-        hit_rate=hit_rate,
+    try:
+        prices, sizes = storage.fetch_fills_arrays(market)
+    finally:
+        storage.close()
+
+    total = prices.size
+    if total < 2:
+        return BacktestResult(total_pnl=0.0, max_drawdown=0.0, hit_rate=0.0)
+
+    # Each fill marks the running position to its price, then becomes the new
+    # reference price. A flat position contributes exactly 0, which adds nothing
+    # to PnL, hits or drawdown, so no masking pass is needed.
+    position = np.cumsum(sizes)[:-1]
+    pnl_change = np.diff(prices) * position
+    equity_curve = np.cumsum(pnl_change)
+
+    return BacktestResult(
+        total_pnl=float(equity_curve[-1]),
+        max_drawdown=compute_drawdown(np.concatenate(([0.0], equity_curve))),
+        hit_rate=np.count_nonzero(pnl_change > 0) / total,
     )
-    storage.close()
-    return result
@@ -1,11 +1,16 @@
+import mmap
 import os
-from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Mapping, Optional, Tuple
 
 import yaml
 
+# libyaml's C loader when PyYAML was built against it; same safe semantics.
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class RiskConfig:
     max_position_per_market: float
     max_global_exposure: float
@@ -13,7 +18,7 @@ class RiskConfig:
     max_orders_per_minute: int
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class StrategyConfig:
     anomaly_threshold: float
     min_impact_per_volume: float
@@ -23,7 +28,7 @@ class StrategyConfig:
     atr_window: int
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class DetectorConfig:
     volume_windows_sec: List[int]
     baseline_window_sec: int
@@ -33,7 +38,7 @@ class DetectorConfig:
     imbalance_depth_levels: int
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ExecutionConfig:
     order_size_default: float
     order_size_percent_wallet: Optional[float]
@@ -43,7 +48,7 @@ class ExecutionConfig:
     retry_backoff_sec: float
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PolymarketConfig:
     rest_base_url: str
     ws_url: Optional[str]
@@ -56,14 +61,14 @@ class PolymarketConfig:
     wallet_public_key: Optional[str]
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class AlertsConfig:
     discord_webhook_url: str
     throttle_sec: int
     batch_size: int
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class AppConfig:
     trading_mode: str
     allowlist_markets: List[str]
@@ -79,112 +84,203 @@ class AppConfig:
     raw: Dict[str, Any] = field(default_factory=dict)
 
 
-def _env_override(key: str, default: Optional[str]) -> Optional[str]:
-    value = os.environ.get(key)
+def _env_override(env: Mapping[str, str], key: str, default: Optional[str]) -> Optional[str]:
+    value = env.get(key)
     if value is None:
         return default
     return value
 
 
-def _env_int(key: str, default: int) -> int:
-    value = os.environ.get(key)
+def _env_int(env: Mapping[str, str], key: str, default: int) -> int:
+    value = env.get(key)
     if value is None or value == "":
         return default
     return int(value)
 
 
-def _env_float(key: str, default: float) -> float:
-    value = os.environ.get(key)
+def _env_float(env: Mapping[str, str], key: str, default: float) -> float:
+    value = env.get(key)
     if value is None or value == "":
         return default
     return float(value)
 
 
-def _env_list(key: str) -> List[str]:
-    value = os.environ.get(key)
+def _env_list(env: Mapping[str, str], key: str) -> List[str]:
+    value = env.get(key)
     if value is None or value.strip() == "":
         return []
     return [item.strip() for item in value.split(",") if item.strip()]
 
 
+def _load_yaml(path: str) -> Dict[str, Any]:
+    with open(path, "rb") as handle:
+        # mmap cannot map an empty file; parse it the same way the loader would.
+        if os.fstat(handle.fileno()).st_size == 0:
+            return yaml.load(b"", Loader=_YamlLoader)
+        # The loader reads straight from the mapped page cache instead of a copied buffer.
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return yaml.load(mapped, Loader=_YamlLoader)
+
+
+# Every env var _build_config reads; the cache key covers only these.
+_ENV_KEYS = frozenset(
+    (
+        "TRADING_MODE",
+        "ALLOWLIST_MARKETS",
+        "TOP_N_BY_VOLUME",
+        "DATA_POLL_SEC",
+        "HEALTH_CHECK_SEC",
+        "POLYMARKET_REST_BASE_URL",
+        "POLYMARKET_WS_URL",
+        "POLYMARKET_API_KEY",
+        "POLYMARKET_API_SECRET",
+        "POLYMARKET_API_PASSPHRASE",
+        "WALLET_SIGNER_MODE",
+        "PRIVATE_KEY",
+        "WALLET_SIGNER_URL",
+        "WALLET_PUBLIC_KEY",
+        "BASELINE_WINDOW_SEC",
+        "CHURN_WINDOW_SEC",
+        "REPEAT_PRINT_WINDOW_SEC",
+        "SPREAD_WINDOW_SEC",
+        "IMBALANCE_DEPTH_LEVELS",
+        "ANOMALY_THRESHOLD",
+        "MIN_IMPACT_PER_VOLUME",
+        "TAKE_PROFIT_BPS",
+        "STOP_LOSS_BPS",
+        "TIME_STOP_MIN",
+        "ATR_WINDOW",
+        "ORDER_SIZE_DEFAULT",
+        "ORDER_SIZE_PERCENT_WALLET",
+        "WALLET_BALANCE_OVERRIDE",
+        "RATE_LIMIT_PER_MINUTE",
+        "RETRY_ATTEMPTS",
+        "RETRY_BACKOFF_SEC",
+        "MAX_POSITION_PER_MARKET",
+        "MAX_GLOBAL_EXPOSURE",
+        "MAX_DAILY_LOSS",
+        "MAX_ORDERS_PER_MINUTE",
+        "DISCORD_WEBHOOK_URL",
+        "ALERT_THROTTLE_SEC",
+        "ALERT_BATCH_SIZE",
+    )
+)
+
+
 def load_config(path: str) -> AppConfig:
-    with open(path, "r", encoding="utf-8") as handle:
-        raw = yaml.safe_load(handle)
+    # Parsed configs are cached by file identity (mtime + size) and the values of
+    # the env vars _build_config reads, so edits or env changes trigger a rebuild.
+    stat = os.stat(path)
+    # Intersecting first skips os.environ.get, which raises and catches KeyError for
+    # every unset key.
+    env_items = frozenset((key, os.environ[key]) for key in _ENV_KEYS.intersection(os.environ))
+    config = _load_config_cached(path, stat.st_mtime_ns, stat.st_size, env_items)
+    # The config dataclasses are frozen, so only the mutable containers need
+    # copying before a caller gets them; never hand out the cached lists or raw.
+    return replace(
+        config,
+        allowlist_markets=list(config.allowlist_markets),
+        detector=replace(config.detector, volume_windows_sec=list(config.detector.volume_windows_sec)),
+        raw=_copy_containers(config.raw),
+    )
+
+
+def _copy_containers(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {key: _copy_containers(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy_containers(item) for item in value]
+    return value
+
+
+@lru_cache(maxsize=128)
+def _load_config_cached(
+    path: str, mtime_ns: int, size: int, env_items: FrozenSet[Tuple[str, str]]
+) -> AppConfig:
+    return _build_config(_load_yaml(path), dict(env_items))
+
+
+load_config.cache_clear = _load_config_cached.cache_clear
+load_config.cache_info = _load_config_cached.cache_info
+
 
-    trading_mode = _env_override("TRADING_MODE", raw.get("trading_mode", "simulation"))
+def _build_config(raw: Dict[str, Any], env: Mapping[str, str]) -> AppConfig:
+    trading_mode = _env_override(env, "TRADING_MODE", raw.get("trading_mode", "simulation"))
 
     polymarket = raw.get("polymarket", {})
     polymarket_cfg = PolymarketConfig(
-        rest_base_url=_env_override("POLYMARKET_REST_BASE_URL", polymarket.get("rest_base_url", "")),
-        ws_url=_env_override("POLYMARKET_WS_URL", polymarket.get("ws_url")),
-        api_key=_env_override("POLYMARKET_API_KEY", polymarket.get("api_key")),
-        api_secret=_env_override("POLYMARKET_API_SECRET", polymarket.get("api_secret")),
-        api_passphrase=_env_override("POLYMARKET_API_PASSPHRASE", polymarket.get("api_passphrase")),
-        wallet_signer_mode=_env_override("WALLET_SIGNER_MODE", polymarket.get("wallet_signer_mode", "external")),
-        private_key=_env_override("PRIVATE_KEY", polymarket.get("private_key")),
-        wallet_signer_url=_env_override("WALLET_SIGNER_URL", polymarket.get("wallet_signer_url")),
-        wallet_public_key=_env_override("WALLET_PUBLIC_KEY", polymarket.get("wallet_public_key")),
+        rest_base_url=_env_override(env, "POLYMARKET_REST_BASE_URL", polymarket.get("rest_base_url", "")),
+        ws_url=_env_override(env, "POLYMARKET_WS_URL", polymarket.get("ws_url")),
+        api_key=_env_override(env, "POLYMARKET_API_KEY", polymarket.get("api_key")),
+        api_secret=_env_override(env, "POLYMARKET_API_SECRET", polymarket.get("api_secret")),
+        api_passphrase=_env_override(env, "POLYMARKET_API_PASSPHRASE", polymarket.get("api_passphrase")),
+        wallet_signer_mode=_env_override(env, "WALLET_SIGNER_MODE", polymarket.get("wallet_signer_mode", "external")),
+        private_key=_env_override(env, "PRIVATE_KEY", polymarket.get("private_key")),
+        wallet_signer_url=_env_override(env, "WALLET_SIGNER_URL", polymarket.get("wallet_signer_url")),
+        wallet_public_key=_env_override(env, "WALLET_PUBLIC_KEY", polymarket.get("wallet_public_key")),
     )
 
     detector = raw.get("detector", {})
     detector_cfg = DetectorConfig(
         volume_windows_sec=detector.get("volume_windows_sec", [60, 300]),
-        baseline_window_sec=_env_int("BASELINE_WINDOW_SEC", detector.get("baseline_window_sec", 1800)),
-        churn_window_sec=_env_int("CHURN_WINDOW_SEC", detector.get("churn_window_sec", 300)),
-        repeat_print_window_sec=_env_int("REPEAT_PRINT_WINDOW_SEC", detector.get("repeat_print_window_sec", 120)),
-        spread_window_sec=_env_int("SPREAD_WINDOW_SEC", detector.get("spread_window_sec", 300)),
-        imbalance_depth_levels=_env_int("IMBALANCE_DEPTH_LEVELS", detector.get("imbalance_depth_levels", 5)),
+        baseline_window_sec=_env_int(env, "BASELINE_WINDOW_SEC", detector.get("baseline_window_sec", 1800)),
+        churn_window_sec=_env_int(env, "CHURN_WINDOW_SEC", detector.get("churn_window_sec", 300)),
+        repeat_print_window_sec=_env_int(env, "REPEAT_PRINT_WINDOW_SEC", detector.get("repeat_print_window_sec", 120)),
+        spread_window_sec=_env_int(env, "SPREAD_WINDOW_SEC", detector.get("spread_window_sec", 300)),
+        imbalance_depth_levels=_env_int(env, "IMBALANCE_DEPTH_LEVELS", detector.get("imbalance_depth_levels", 5)),
     )
 
     strategy = raw.get("strategy", {})
     strategy_cfg = StrategyConfig(
-        anomaly_threshold=_env_float("ANOMALY_THRESHOLD", strategy.get("anomaly_threshold", 0.75)),
-        min_impact_per_volume=_env_float("MIN_IMPACT_PER_VOLUME", strategy.get("min_impact_per_volume", 0.002)),
-        take_profit_bps=_env_int("TAKE_PROFIT_BPS", strategy.get("take_profit_bps", 40)),
-        stop_loss_bps=_env_int("STOP_LOSS_BPS", strategy.get("stop_loss_bps", 25)),
-        time_stop_min=_env_int("TIME_STOP_MIN", strategy.get("time_stop_min", 10)),
-        atr_window=_env_int("ATR_WINDOW", strategy.get("atr_window", 14)),
+        anomaly_threshold=_env_float(env, "ANOMALY_THRESHOLD", strategy.get("anomaly_threshold", 0.75)),
+        min_impact_per_volume=_env_float(env, "MIN_IMPACT_PER_VOLUME", strategy.get("min_impact_per_volume", 0.002)),
+        take_profit_bps=_env_int(env, "TAKE_PROFIT_BPS", strategy.get("take_profit_bps", 40)),
+        stop_loss_bps=_env_int(env, "STOP_LOSS_BPS", strategy.get("stop_loss_bps", 25)),
+        time_stop_min=_env_int(env, "TIME_STOP_MIN", strategy.get("time_stop_min", 10)),
+        atr_window=_env_int(env, "ATR_WINDOW", strategy.get("atr_window", 14)),
     )
 
     execution = raw.get("execution", {})
     execution_cfg = ExecutionConfig(
-        order_size_default=_env_float("ORDER_SIZE_DEFAULT", execution.get("order_size_default", 10.0)),
+        order_size_default=_env_float(env, "ORDER_SIZE_DEFAULT", execution.get("order_size_default", 10.0)),
         order_size_percent_wallet=_env_float(
+            env,
             "ORDER_SIZE_PERCENT_WALLET",
             execution.get("order_size_percent_wallet", 0.0),
         )
         or None,
         wallet_balance_override=_env_float(
+            env,
             "WALLET_BALANCE_OVERRIDE",
             execution.get("wallet_balance_override", 0.0),
         )
         or None,
-        rate_limit_per_minute=_env_int("RATE_LIMIT_PER_MINUTE", execution.get("rate_limit_per_minute", 30)),
-        retry_attempts=_env_int("RETRY_ATTEMPTS", execution.get("retry_attempts", 3)),
-        retry_backoff_sec=_env_float("RETRY_BACKOFF_SEC", execution.get("retry_backoff_sec", 0.5)),
+        rate_limit_per_minute=_env_int(env, "RATE_LIMIT_PER_MINUTE", execution.get("rate_limit_per_minute", 30)),
+        retry_attempts=_env_int(env, "RETRY_ATTEMPTS", execution.get("retry_attempts", 3)),
+        retry_backoff_sec=_env_float(env, "RETRY_BACKOFF_SEC", execution.get("retry_backoff_sec", 0.5)),
     )
 
     risk = raw.get("risk", {})
     risk_cfg = RiskConfig(
-        max_position_per_market=_env_float("MAX_POSITION_PER_MARKET", risk.get("max_position_per_market", 100.0)),
-        max_global_exposure=_env_float("MAX_GLOBAL_EXPOSURE", risk.get("max_global_exposure", 500.0)),
-        max_daily_loss=_env_float("MAX_DAILY_LOSS", risk.get("max_daily_loss", 50.0)),
-        max_orders_per_minute=_env_int("MAX_ORDERS_PER_MINUTE", risk.get("max_orders_per_minute", 20)),
+        max_position_per_market=_env_float(env, "MAX_POSITION_PER_MARKET", risk.get("max_position_per_market", 100.0)),
+        max_global_exposure=_env_float(env, "MAX_GLOBAL_EXPOSURE", risk.get("max_global_exposure", 500.0)),
+        max_daily_loss=_env_float(env, "MAX_DAILY_LOSS", risk.get("max_daily_loss", 50.0)),
+        max_orders_per_minute=_env_int(env, "MAX_ORDERS_PER_MINUTE", risk.get("max_orders_per_minute", 20)),
     )
 
     alerts = raw.get("alerts", {})
     alerts_cfg = AlertsConfig(
-        discord_webhook_url=_env_override("DISCORD_WEBHOOK_URL", alerts.get("discord_webhook_url", "")),
-        throttle_sec=_env_int("ALERT_THROTTLE_SEC", alerts.get("throttle_sec", 15)),
-        batch_size=_env_int("ALERT_BATCH_SIZE", alerts.get("batch_size", 5)),
+        discord_webhook_url=_env_override(env, "DISCORD_WEBHOOK_URL", alerts.get("discord_webhook_url", "")),
+        throttle_sec=_env_int(env, "ALERT_THROTTLE_SEC", alerts.get("throttle_sec", 15)),
+        batch_size=_env_int(env, "ALERT_BATCH_SIZE", alerts.get("batch_size", 5)),
     )
 
     return AppConfig(
         trading_mode=trading_mode,
-        allowlist_markets=_env_list("ALLOWLIST_MARKETS") or raw.get("allowlist_markets", []),
-        top_n_by_volume=_env_int("TOP_N_BY_VOLUME", raw.get("top_n_by_volume") or 0) or None,
-        data_poll_sec=_env_int("DATA_POLL_SEC", raw.get("data_poll_sec", 5)),
-        health_check_sec=_env_int("HEALTH_CHECK_SEC", raw.get("health_check_sec", 30)),
+        allowlist_markets=_env_list(env, "ALLOWLIST_MARKETS") or raw.get("allowlist_markets", []),
+        top_n_by_volume=_env_int(env, "TOP_N_BY_VOLUME", raw.get("top_n_by_volume") or 0) or None,
+        data_poll_sec=_env_int(env, "DATA_POLL_SEC", raw.get("data_poll_sec", 5)),
+        health_check_sec=_env_int(env, "HEALTH_CHECK_SEC", raw.get("health_check_sec", 30)),
         polymarket=polymarket_cfg,
         detector=detector_cfg,
         strategy=strategy_cfg,
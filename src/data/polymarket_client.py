@@ -1,16 +1,33 @@
 import json
+import sys
 import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any, Callable, Dict, Iterable, List, Optional
+from functools import lru_cache
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional
 
+import orjson
 import requests
 import websockets
+from requests.adapters import HTTPAdapter
 from websockets.sync.client import connect
 
 
-@dataclass
+if sys.version_info >= (3, 11):
+    # 3.11+ parses the trailing "Z" natively in C.
+    _parse_iso = datetime.fromisoformat
+else:
+    def _parse_iso(value: str) -> datetime:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+_DROP_WARNING_INTERVAL_SEC = 10.0
+
+
+@dataclass(slots=True)
 class Market:
     market_id: str
     title: str
@@ -18,7 +35,7 @@ class Market:
     volume: float
 
 
-@dataclass
+@dataclass(slots=True)
 class OrderBook:
     market_id: str
     bids: List[List[float]]
@@ -26,7 +43,7 @@ class OrderBook:
     timestamp: datetime
 
 
-@dataclass
+@dataclass(slots=True)
 class TradePrint:
     market_id: str
     trade_id: str
@@ -44,6 +61,7 @@ class PolymarketClient:
         api_key: Optional[str] = None,
         api_secret: Optional[str] = None,
         api_passphrase: Optional[str] = None,
+        ws_inbox_size: int = 8192,
     ) -> None:
         self.rest_base_url = rest_base_url.rstrip("/")
         self.ws_url = ws_url
@@ -51,8 +69,24 @@ class PolymarketClient:
         self.api_secret = api_secret
         self.api_passphrase = api_passphrase
         self.session = requests.Session()
+        # Multi-market polling keeps many requests in flight against one host.
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._base_headers = self._headers()
+        self._market_url = lru_cache(maxsize=4096)(self._build_market_url)
         self._ws = None
         self._ws_thread: Optional[threading.Thread] = None
+        self._dispatch_thread: Optional[threading.Thread] = None
+        # The WS thread only decodes and hands off; callbacks run on the dispatch thread.
+        # Trades go through a bounded deque (oldest dropped under overload, counted
+        # and reported) and orderbooks are coalesced to the latest snapshot per market.
+        self._trade_inbox: Deque[Dict[str, Any]] = deque(maxlen=ws_inbox_size)
+        self.dropped_trade_messages = 0
+        self._last_drop_warning = 0.0
+        self._pending_books: Dict[str, Dict[str, Any]] = {}
+        self._books_lock = threading.Lock()
+        self._inbox_ready = threading.Event()
         self._on_trade: Optional[Callable[[TradePrint], None]] = None
         self._on_orderbook: Optional[Callable[[OrderBook], None]] = None
         self._running = False
@@ -65,11 +99,14 @@ class PolymarketClient:
             headers["X-API-PASSPHRASE"] = self.api_passphrase
         return headers
 
+    def _build_market_url(self, market_id: str, resource: str) -> str:
+        return f"{self.rest_base_url}/markets/{market_id}/{resource}"
+
     def list_markets(self, limit: int = 200) -> List[Market]:
         url = f"{self.rest_base_url}/markets"
-        response = self.session.get(url, headers=self._headers(), params={"limit": limit}, timeout=10)
+        response = self.session.get(url, headers=self._base_headers, params={"limit": limit}, timeout=10)
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content)
         
         # Handle different response formats (list vs dict with 'markets' key)
         if isinstance(data, dict):
@@ -82,25 +119,22 @@ class PolymarketClient:
         else:
             items = []
 
-        markets = []
-        for item in items:
-            if not isinstance(item, dict):
-                continue
-            markets.append(
-                Market(
-                    market_id=str(item.get("id") or item.get("condition_id") or item.get("market_id")),
-                    title=item.get("title", item.get("question", "")),
-                    status=item.get("status", "active"),
-                    volume=float(item.get("volume", 0)),
-                )
+        return [
+            Market(
+                market_id=str(item.get("id") or item.get("condition_id") or item.get("market_id")),
+                title=item.get("title", item.get("question", "")),
+                status=item.get("status", "active"),
+                volume=float(item.get("volume", 0)),
             )
-        return markets
+            for item in items
+            if isinstance(item, dict)
+        ]
 
     def get_orderbook(self, market_id: str) -> OrderBook:
-        url = f"{self.rest_base_url}/markets/{market_id}/orderbook"
-        response = self.session.get(url, headers=self._headers(), timeout=10)
+        url = self._market_url(market_id, "orderbook")
+        response = self.session.get(url, headers=self._base_headers, timeout=10)
         response.raise_for_status()
-        payload = response.json()
+        payload = orjson.loads(response.content)
         bids = payload.get("bids", [])
         asks = payload.get("asks", [])
         return OrderBook(
@@ -111,10 +145,10 @@ class PolymarketClient:
         )
 
     def get_recent_trades(self, market_id: str, limit: int = 200) -> List[TradePrint]:
-        url = f"{self.rest_base_url}/markets/{market_id}/trades"
-        response = self.session.get(url, headers=self._headers(), params={"limit": limit}, timeout=10)
+        url = self._market_url(market_id, "trades")
+        response = self.session.get(url, headers=self._base_headers, params={"limit": limit}, timeout=10)
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content)
         
         if isinstance(data, dict):
             items = data.get("trades", [])
@@ -124,14 +158,20 @@ class PolymarketClient:
             items = []
 
         trades = []
+        utc = timezone.utc
+        fromtimestamp = datetime.fromtimestamp
+        parse_iso = _parse_iso
+        received_at = datetime.now(utc)
         for item in items:
             if not isinstance(item, dict):
                 continue
             timestamp = item.get("timestamp") or item.get("time")
-            if isinstance(timestamp, (int, float)):
-                ts = datetime.fromtimestamp(timestamp, tz=timezone.utc)
+            if not timestamp:
+                ts = received_at
+            elif type(timestamp) is str:
+                ts = parse_iso(timestamp)
             else:
-                ts = datetime.fromisoformat(timestamp.replace("Z", "+00:00")) if timestamp else datetime.now(timezone.utc)
+                ts = fromtimestamp(timestamp, tz=utc)
             trades.append(
                 TradePrint(
                     market_id=market_id,
@@ -149,6 +189,15 @@ class PolymarketClient:
             yield self.get_recent_trades(market_id)
             time.sleep(sleep_sec)
 
+    def poll_trades_many(
+        self, market_ids: List[str], sleep_sec: int = 5, max_workers: int = 32
+    ) -> Iterable[Dict[str, List[TradePrint]]]:
+        # Fetch every market concurrently each round; the shared session pools the connections.
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(market_ids)))) as pool:
+            while True:
+                yield dict(zip(market_ids, pool.map(self.get_recent_trades, market_ids)))
+                time.sleep(sleep_sec)
+
     def start_ws(
         self,
         market_ids: List[str],
@@ -160,13 +209,18 @@ class PolymarketClient:
         self._on_trade = on_trade
         self._on_orderbook = on_orderbook
         self._running = True
+        self._dispatch_thread = threading.Thread(target=self._dispatch_loop, daemon=True)
+        self._dispatch_thread.start()
         self._ws_thread = threading.Thread(target=self._ws_loop, args=(market_ids,), daemon=True)
         self._ws_thread.start()
 
     def stop_ws(self) -> None:
         self._running = False
+        self._inbox_ready.set()
         if self._ws_thread:
             self._ws_thread.join(timeout=5)
+        if self._dispatch_thread:
+            self._dispatch_thread.join(timeout=5)
 
     def _ws_loop(self, market_ids: List[str]) -> None:
         while self._running:
@@ -183,16 +237,57 @@ class PolymarketClient:
 
                     while self._running:
                         message = ws.recv()
-                        self._handle_ws_message(json.loads(message))
+                        self._enqueue_ws_message(orjson.loads(message))
             except Exception as e:
                 print(f"WS error: {e}. Retrying in 5s...")
                 time.sleep(5)
 
+    def _enqueue_ws_message(self, data: Dict[str, Any]) -> None:
+        if data.get("type") == "orderbook":
+            market_id = data.get("market_id")
+            if not market_id:
+                return
+            with self._books_lock:
+                self._pending_books[market_id] = data
+        else:
+            if len(self._trade_inbox) == self._trade_inbox.maxlen:
+                self._record_trade_drop()
+            self._trade_inbox.append(data)
+        self._inbox_ready.set()
+
+    def _record_trade_drop(self) -> None:
+        self.dropped_trade_messages += 1
+        now = time.monotonic()
+        if now - self._last_drop_warning >= _DROP_WARNING_INTERVAL_SEC:
+            self._last_drop_warning = now
+            print(
+                f"[WARN] WS trade inbox full, dropped oldest trade message "
+                f"({self.dropped_trade_messages} dropped so far)"
+            )
+
+    def _dispatch_loop(self) -> None:
+        while self._running:
+            self._inbox_ready.wait(timeout=1.0)
+            self._inbox_ready.clear()
+            while self._trade_inbox:
+                self._dispatch(self._trade_inbox.popleft())
+            with self._books_lock:
+                books, self._pending_books = self._pending_books, {}
+            for data in books.values():
+                self._dispatch(data)
+
+    def _dispatch(self, data: Dict[str, Any]) -> None:
+        try:
+            self._handle_ws_message(data)
+        except Exception as e:
+            print(f"WS handler error: {e}")
+
     def _handle_ws_message(self, data: Dict[str, Any]) -> None:
         msg_type = data.get("type")
         market_id = data.get("market_id")
         if not market_id:
             return
+        market_id = sys.intern(str(market_id))
 
         if msg_type == "trades" and self._on_trade:
             for item in data.get("trades", []):
@@ -1,7 +1,72 @@
 import sqlite3
+import time
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Dict, Iterable, Optional
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+
+import numpy as np
+
+
+def _epoch_us(ts: datetime) -> int:
+    return round(ts.timestamp() * 1_000_000)
+
+
+def _text_to_epoch_us(value: Any) -> Optional[int]:
+    if value is None or isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return round(value)
+    # Legacy rows hold ISO strings; epoch values written into a TEXT column come back as digits.
+    text = str(value).strip()
+    if text.lstrip("-").isdigit():
+        return int(text)
+    return _epoch_us(datetime.fromisoformat(text.replace("Z", "+00:00")))
+
+
+# Errors caused by one row's values; anything else affects the whole batch.
+_ROW_ERRORS = (sqlite3.IntegrityError, sqlite3.InterfaceError, sqlite3.ProgrammingError, sqlite3.DataError)
+
+_TABLES: Dict[str, str] = {
+    "trades": """
+        market TEXT,
+        trade_id TEXT,
+        price REAL,
+        size REAL,
+        side TEXT,
+        timestamp INTEGER,
+        PRIMARY KEY (market, trade_id)
+    """,
+    "orderbook_snapshots": """
+        market TEXT,
+        timestamp INTEGER,
+        bids TEXT,
+        asks TEXT
+    """,
+    "signals": """
+        market TEXT,
+        timestamp INTEGER,
+        score REAL,
+        payload TEXT
+    """,
+    "orders": """
+        market TEXT,
+        timestamp INTEGER,
+        order_id TEXT,
+        side TEXT,
+        price REAL,
+        size REAL,
+        status TEXT,
+        payload TEXT
+    """,
+    "fills": """
+        market TEXT,
+        timestamp INTEGER,
+        order_id TEXT,
+        price REAL,
+        size REAL,
+        payload TEXT
+    """,
+}
 
 
 @dataclass
@@ -53,80 +118,125 @@ class FillRecord:
 
 
 class SqliteStorage:
-    def __init__(self, path: str) -> None:
+    def __init__(self, path: str, commit_every: int = 100, commit_interval_sec: float = 1.0) -> None:
         self.path = path
+        self.commit_every = commit_every
+        self.commit_interval_sec = commit_interval_sec
         self.connection = sqlite3.connect(self.path)
         self.connection.execute("PRAGMA journal_mode=WAL")
         self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("PRAGMA temp_store=MEMORY")
+        self.connection.execute("PRAGMA mmap_size=268435456")
         self._init_schema()
+        self._pending = 0
+        self._last_commit = time.monotonic()
+
+    def _record_writes(self, count: int = 1) -> None:
+        self._pending += count
+        self.flush()
+
+    def flush(self, force: bool = False) -> None:
+        if not self._pending:
+            return
+        now = time.monotonic()
+        if force or self._pending >= self.commit_every or now - self._last_commit >= self.commit_interval_sec:
+            self.connection.commit()
+            self._pending = 0
+            self._last_commit = now
 
     def _init_schema(self) -> None:
+        self._migrate_text_timestamps()
+        tables = "".join(
+            f"CREATE TABLE IF NOT EXISTS {table} ({columns});" for table, columns in _TABLES.items()
+        )
         self.connection.executescript(
-            """
-            CREATE TABLE IF NOT EXISTS trades (
-                market TEXT,
-                trade_id TEXT,
-                price REAL,
-                size REAL,
-                side TEXT,
-                timestamp TEXT,
-                PRIMARY KEY (market, trade_id)
-            );
-            CREATE TABLE IF NOT EXISTS orderbook_snapshots (
-                market TEXT,
-                timestamp TEXT,
-                bids TEXT,
-                asks TEXT
-            );
-            CREATE TABLE IF NOT EXISTS signals (
-                market TEXT,
-                timestamp TEXT,
-                score REAL,
-                payload TEXT
-            );
-            CREATE TABLE IF NOT EXISTS orders (
-                market TEXT,
-                timestamp TEXT,
-                order_id TEXT,
-                side TEXT,
-                price REAL,
-                size REAL,
-                status TEXT,
-                payload TEXT
-            );
-            CREATE TABLE IF NOT EXISTS fills (
-                market TEXT,
-                timestamp TEXT,
-                order_id TEXT,
-                price REAL,
-                size REAL,
-                payload TEXT
-            );
+            tables
+            + """
+            CREATE INDEX IF NOT EXISTS idx_trades_market_ts ON trades(market, timestamp);
+            CREATE INDEX IF NOT EXISTS idx_orderbook_market_ts ON orderbook_snapshots(market, timestamp);
+            CREATE INDEX IF NOT EXISTS idx_signals_market_ts ON signals(market, timestamp);
+            CREATE INDEX IF NOT EXISTS idx_orders_market_ts ON orders(market, timestamp);
+            CREATE INDEX IF NOT EXISTS idx_fills_market_ts ON fills(market, timestamp);
+            CREATE VIEW IF NOT EXISTS trades_readable AS
+                SELECT market, trade_id, price, size, side, DATETIME(timestamp / 1e6, 'unixepoch') AS timestamp
+                FROM trades;
+            CREATE VIEW IF NOT EXISTS fills_readable AS
+                SELECT market, DATETIME(timestamp / 1e6, 'unixepoch') AS timestamp, order_id, price, size, payload
+                FROM fills;
             """
         )
         self.connection.commit()
 
-    def insert_trades(self, trades: Iterable[Trade]) -> int:
-        cursor = self.connection.cursor()
-        count = 0
-        for trade in trades:
+    def _migrate_text_timestamps(self) -> None:
+        # Databases created before timestamps became epoch microseconds declare
+        # them TEXT. That affinity would store new integers as text that sorts
+        # before the old ISO strings, so rebuild such tables with INTEGER values.
+        self.connection.create_function("epoch_us", 1, _text_to_epoch_us, deterministic=True)
+        for table, columns in _TABLES.items():
+            info = self.connection.execute(f"PRAGMA table_info({table})").fetchall()
+            if not any(name == "timestamp" and decl.upper() == "TEXT" for _, name, decl, *_ in info):
+                continue
+            names = [name for _, name, *_ in info]
+            select = ", ".join("epoch_us(timestamp)" if name == "timestamp" else name for name in names)
             try:
-                cursor.execute(
-                    "INSERT OR IGNORE INTO trades VALUES (?, ?, ?, ?, ?, ?)",
-                    (
-                        trade.market,
-                        trade.trade_id,
-                        trade.price,
-                        trade.size,
-                        trade.side,
-                        trade.timestamp.isoformat(),
-                    ),
+                self.connection.execute("BEGIN")
+                self.connection.execute(f"CREATE TABLE {table}_migrated ({columns})")
+                self.connection.execute(
+                    f"INSERT INTO {table}_migrated ({', '.join(names)}) SELECT {select} FROM {table}"
                 )
-                if cursor.rowcount:
-                    count += 1
-            except sqlite3.Error:
-                continue
-        self.connection.commit()
+                self.connection.execute(f"DROP TABLE {table}")
+                self.connection.execute(f"ALTER TABLE {table}_migrated RENAME TO {table}")
+                self.connection.commit()
+            except sqlite3.Error as e:
+                self.connection.rollback()
+                raise RuntimeError(
+                    f"Could not migrate {self.path} table {table} from TEXT to INTEGER timestamps: {e}"
+                ) from e
+            print(f"[INFO] Migrated {table}.timestamp from TEXT to INTEGER epoch microseconds")
+
+    def _executemany(self, sql: str, rows: Iterable[Tuple[Any, ...]]) -> int:
+        rows = list(rows)
+        # Open the transaction ourselves so RELEASE below does not commit it;
+        # commits stay batched by _record_writes/flush.
+        if not self.connection.in_transaction:
+            self.connection.execute("BEGIN")
+        self.connection.execute("SAVEPOINT batch")
+        try:
+            try:
+                count = self.connection.executemany(sql, rows).rowcount
+            except _ROW_ERRORS:
+                # Undo the partial batch and retry row by row so a bad row only drops itself.
+                self.connection.execute("ROLLBACK TO batch")
+                count = 0
+                for row in rows:
+                    try:
+                        count += self.connection.execute(sql, row).rowcount
+                    except _ROW_ERRORS as e:
+                        print(f"[WARN] Skipping row that failed to insert: {e}")
+        except sqlite3.Error:
+            # Locked or failing database: every row would fail alike, so leave the
+            # batch to the caller to retry.
+            self.connection.execute("ROLLBACK TO batch")
+            self.connection.execute("RELEASE batch")
+            raise
+        self.connection.execute("RELEASE batch")
+        return count
+
+    def insert_trades(self, trades: Iterable[Trade]) -> int:
+        rows = (
+            (
+                trade.market,
+                trade.trade_id,
+                trade.price,
+                trade.size,
+                trade.side,
+                _epoch_us(trade.timestamp),
+            )
+            for trade in trades
+        )
+        # Rowcount sums over all rows; ignored duplicates add nothing.
+        count = self._executemany("INSERT OR IGNORE INTO trades VALUES (?, ?, ?, ?, ?, ?)", rows)
+        self._record_writes(count)
         return count
 
     def insert_orderbook(self, snapshot: OrderBookSnapshot) -> None:
@@ -134,31 +244,45 @@ class SqliteStorage:
             "INSERT INTO orderbook_snapshots VALUES (?, ?, ?, ?)",
             (
                 snapshot.market,
-                snapshot.timestamp.isoformat(),
+                _epoch_us(snapshot.timestamp),
                 snapshot.bids,
                 snapshot.asks,
             ),
         )
-        self.connection.commit()
+        self._record_writes()
+
+    def insert_orderbooks(self, snapshots: Iterable[OrderBookSnapshot]) -> int:
+        rows = (
+            (
+                snapshot.market,
+                _epoch_us(snapshot.timestamp),
+                snapshot.bids,
+                snapshot.asks,
+            )
+            for snapshot in snapshots
+        )
+        count = self._executemany("INSERT INTO orderbook_snapshots VALUES (?, ?, ?, ?)", rows)
+        self._record_writes(count)
+        return count
 
     def insert_signal(self, signal: SignalRecord) -> None:
         self.connection.execute(
             "INSERT INTO signals VALUES (?, ?, ?, ?)",
             (
                 signal.market,
-                signal.timestamp.isoformat(),
+                _epoch_us(signal.timestamp),
                 signal.score,
                 signal.payload,
             ),
         )
-        self.connection.commit()
+        self._record_writes()
 
     def insert_order(self, order: OrderRecord) -> None:
         self.connection.execute(
             "INSERT INTO orders VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
             (
                 order.market,
-                order.timestamp.isoformat(),
+                _epoch_us(order.timestamp),
                 order.order_id,
                 order.side,
                 order.price,
@@ -167,25 +291,31 @@ class SqliteStorage:
                 order.payload,
             ),
         )
-        self.connection.commit()
+        self._record_writes()
 
     def insert_fill(self, fill: FillRecord) -> None:
         self.connection.execute(
             "INSERT INTO fills VALUES (?, ?, ?, ?, ?, ?)",
             (
                 fill.market,
-                fill.timestamp.isoformat(),
+                _epoch_us(fill.timestamp),
                 fill.order_id,
                 fill.price,
                 fill.size,
                 fill.payload,
             ),
         )
-        self.connection.commit()
+        self._record_writes()
 
-    def fetch_trades(self, market: str, since: Optional[str] = None) -> Iterable[Dict[str, Any]]:
+    def fetch_trades(
+        self, market: str, since: Optional[Union[str, int, datetime]] = None
+    ) -> Iterable[Dict[str, Any]]:
         cursor = self.connection.cursor()
         if since:
+            if isinstance(since, str):
+                since = datetime.fromisoformat(since.replace("Z", "+00:00"))
+            if isinstance(since, datetime):
+                since = _epoch_us(since)
             cursor.execute(
                 "SELECT market, trade_id, price, size, side, timestamp FROM trades WHERE market = ? AND timestamp >= ? ORDER BY timestamp ASC",
                 (market, since),
@@ -196,8 +326,17 @@ class SqliteStorage:
                 (market,),
             )
         columns = [desc[0] for desc in cursor.description]
-        for row in cursor.fetchall():
+        for row in cursor:
             yield dict(zip(columns, row))
 
+    def fetch_fills_arrays(self, market: str) -> Tuple[np.ndarray, np.ndarray]:
+        cursor = self.connection.execute(
+            "SELECT price, size FROM fills WHERE market = ? ORDER BY timestamp ASC",
+            (market,),
+        )
+        fills = np.fromiter(cursor, dtype=[("price", np.float64), ("size", np.float64)])
+        return fills["price"], fills["size"]
+
     def close(self) -> None:
+        self.flush(force=True)
         self.connection.close()
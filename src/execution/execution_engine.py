@@ -4,6 +4,7 @@ from dataclasses import dataclass
 from typing import Any, Dict, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from src.execution.wallet_signer import WalletSigner
 
@@ -27,6 +28,8 @@ class ExecutionEngine:
         retry_backoff_sec: float,
         wallet_signer: Optional[WalletSigner] = None,
     ) -> None:
+        if rate_limit_per_minute <= 0:
+            raise ValueError("rate_limit_per_minute must be positive")
         self.rest_base_url = rest_base_url.rstrip("/")
         self.api_key = api_key
         self.api_secret = api_secret
@@ -37,8 +40,17 @@ class ExecutionEngine:
         self.retry_backoff_sec = retry_backoff_sec
         self.wallet_signer = wallet_signer
         self.session = requests.Session()
+        # Keep-alive pool so bursts of orders/cancels reuse warm TLS connections.
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=32)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         self.requests_sent = 0
-        self.last_reset = time.time()
+        self._base_headers = self._headers()
+        # Token bucket: refills continuously at rate_limit_per_minute / 60 per second,
+        # holding at most one minute's worth of burst.
+        self._refill_rate = rate_limit_per_minute / 60.0
+        self._tokens = float(rate_limit_per_minute)
+        self._last_refill = time.monotonic()
 
     def _headers(self) -> Dict[str, str]:
         headers: Dict[str, str] = {"Accept": "application/json"}
@@ -49,25 +61,25 @@ class ExecutionEngine:
         return headers
 
     def _rate_limit(self) -> None:
-        now = time.time()
-        if now - self.last_reset >= 60:
-            self.requests_sent = 0
-            self.last_reset = now
-        if self.requests_sent >= self.rate_limit_per_minute:
-            time.sleep(60 - (now - self.last_reset))
-            self.requests_sent = 0
-            self.last_reset = time.time()
+        now = time.monotonic()
+        self._tokens = min(self.rate_limit_per_minute, self._tokens + (now - self._last_refill) * self._refill_rate)
+        self._last_refill = now
+        if self._tokens < 1:
+            time.sleep((1 - self._tokens) / self._refill_rate)
+            self._tokens = 1.0
+            self._last_refill = time.monotonic()
+        self._tokens -= 1
 
     def place_order(self, payload: Dict[str, Any]) -> OrderResponse:
-        self._rate_limit()
         if self.trading_mode != "live":
             return OrderResponse(order_id=f"sim-{uuid.uuid4().hex[:10]}", status="simulated", payload=payload)
         if self.wallet_signer is None:
             raise ValueError("Live trading requires a wallet signer")
         url = f"{self.rest_base_url}/orders"
+        # The payload is identical on every attempt, so one signature covers all retries.
+        headers = {**self._base_headers, **self.wallet_signer.sign(payload).headers}
         for attempt in range(self.retry_attempts):
-            signer_headers = self.wallet_signer.sign(payload).headers
-            headers = {**self._headers(), **signer_headers}
+            self._rate_limit()
             response = self.session.post(url, json=payload, headers=headers, timeout=10)
             self.requests_sent += 1
             if response.status_code < 500:
@@ -81,14 +93,13 @@ class ExecutionEngine:
         return OrderResponse(order_id=f"err-{uuid.uuid4().hex[:8]}", status="error", payload={"error": "retry_exhausted"})
 
     def cancel_order(self, order_id: str) -> OrderResponse:
-        self._rate_limit()
         if self.trading_mode != "live":
             return OrderResponse(order_id=order_id, status="cancelled", payload={"mode": "simulated"})
         if self.wallet_signer is None:
             raise ValueError("Live trading requires a wallet signer")
         url = f"{self.rest_base_url}/orders/{order_id}"
-        signer_headers = self.wallet_signer.sign({"order_id": order_id}).headers
-        headers = {**self._headers(), **signer_headers}
+        headers = {**self._base_headers, **self.wallet_signer.sign({"order_id": order_id}).headers}
+        self._rate_limit()
         response = self.session.delete(url, headers=headers, timeout=10)
         self.requests_sent += 1
         response.raise_for_status()
@@ -1,10 +1,18 @@
 import base64
-import json
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Any, Dict, Optional
 
+import orjson
 import requests
-from nacl.signing import SigningKey
+from requests.adapters import HTTPAdapter
+
+try:
+    # OpenSSL's Ed25519 releases the GIL while signing; PyNaCl stays as a fallback.
+    from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+except ImportError:
+    Ed25519PrivateKey = None
+    from nacl.signing import SigningKey
 
 
 @dataclass
@@ -21,6 +29,9 @@ class ExternalWalletSigner(WalletSigner):
     def __init__(self, signer_url: str) -> None:
         self.signer_url = signer_url
         self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=32)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
 
     def sign(self, payload: Dict[str, Any]) -> SignResult:
         response = self.session.post(self.signer_url, json={"payload": payload}, timeout=10)
@@ -42,18 +53,31 @@ class ExternalWalletSigner(WalletSigner):
 
 class PrivateKeyEnvSigner(WalletSigner):
     def __init__(self, private_key: str, public_key: Optional[str] = None) -> None:
-        self.signing_key = SigningKey(_decode_key(private_key))
-        self.public_key = public_key or self.signing_key.verify_key.encode().hex()
+        seed = _decode_key(private_key)
+        if Ed25519PrivateKey is not None:
+            self.signing_key = Ed25519PrivateKey.from_private_bytes(seed)
+            self._sign_bytes = self.signing_key.sign
+            derived_public_key = self.signing_key.public_key().public_bytes_raw().hex()
+        else:
+            self.signing_key = SigningKey(seed)
+            self._sign_bytes = lambda message: self.signing_key.sign(message).signature
+            derived_public_key = self.signing_key.verify_key.encode().hex()
+        self.public_key = public_key or derived_public_key
+        # Ed25519 is deterministic, so retries and repeated payloads can reuse the
+        # finished header dict keyed by the canonical message bytes.
+        self._signed_headers = lru_cache(maxsize=1024)(self._build_headers)
 
-    def sign(self, payload: Dict[str, Any]) -> SignResult:
-        message = json.dumps(payload, separators=(",", ":"), sort_keys=True).encode("utf-8")
-        signed = self.signing_key.sign(message)
-        signature = base64.b64encode(signed.signature).decode("utf-8")
-        headers = {
-            "X-WALLET-SIGNATURE": signature,
+    def _build_headers(self, message: bytes) -> Dict[str, str]:
+        signature = self._sign_bytes(message)
+        return {
+            "X-WALLET-SIGNATURE": base64.b64encode(signature).decode("ascii"),
             "X-WALLET-PUBLIC-KEY": self.public_key,
         }
-        return SignResult(headers=headers)
+
+    def sign(self, payload: Dict[str, Any]) -> SignResult:
+        message = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+        # Copy so a caller mutating its headers cannot poison the cache.
+        return SignResult(headers=dict(self._signed_headers(message)))
 
 
 def _decode_key(value: str) -> bytes:
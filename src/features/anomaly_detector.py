@@ -1,28 +1,128 @@
 from __future__ import annotations
 
-from collections import defaultdict, deque
-from dataclasses import dataclass
-from datetime import datetime, timedelta, timezone
-from statistics import mean, pstdev
-from typing import Deque, Dict, Iterable, List, Tuple
+from collections import defaultdict
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
 
 from src.data.storage import Trade
 
 
+def _to_ns(ts: datetime) -> int:
+    return round(ts.timestamp() * 1_000_000) * 1_000
+
+
 @dataclass
 class OrderBookView:
     best_bid: float
     best_ask: float
     bids: List[Tuple[float, float]]
     asks: List[Tuple[float, float]]
+    # Top-of-book depth summed over the first depth_levels levels at ingest;
+    # depth_levels == 0 means it was not precomputed.
+    depth_levels: int = 0
+    bid_depth: float = 0.0
+    ask_depth: float = 0.0
+    mid: float = field(init=False)
+    spread: float = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.mid = (self.best_bid + self.best_ask) / 2
+        self.spread = self.best_ask - self.best_bid
+
+    @classmethod
+    def from_levels(
+        cls, bids: List[Tuple[float, float]], asks: List[Tuple[float, float]], depth_levels: int
+    ) -> "OrderBookView":
+        return cls(
+            best_bid=bids[0][0] if bids else 0.0,
+            best_ask=asks[0][0] if asks else 0.0,
+            bids=bids,
+            asks=asks,
+            depth_levels=depth_levels,
+            bid_depth=sum(size for _, size in bids[:depth_levels]),
+            ask_depth=sum(size for _, size in asks[:depth_levels]),
+        )
+
+
+class _Series:
+    # Timestamped float columns stored column-wise in NumPy arrays. Live samples
+    # occupy [start, end); trimming advances start and appends compact or grow
+    # the buffers when they run out of room.
+    def __init__(self, columns: int, capacity: int = 256) -> None:
+        self.ts = np.empty(capacity, dtype=np.int64)
+        self.values = np.empty((columns, capacity), dtype=np.float64)
+        self.start = 0
+        self.end = 0
+        self.appended = 0
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+    def live_ts(self) -> np.ndarray:
+        return self.ts[self.start : self.end]
+
+    def live(self, column: int) -> np.ndarray:
+        return self.values[column, self.start : self.end]
 
-    @property
-    def mid(self) -> float:
-        return (self.best_bid + self.best_ask) / 2
+    def _reserve(self, count: int) -> None:
+        capacity = self.ts.size
+        if self.end + count <= capacity:
+            return
+        size = len(self)
+        while size + count > capacity // 2:
+            capacity *= 2
+        ts = np.empty(capacity, dtype=np.int64)
+        values = np.empty((self.values.shape[0], capacity), dtype=np.float64)
+        ts[:size] = self.live_ts()
+        values[:, :size] = self.values[:, self.start : self.end]
+        self.ts, self.values = ts, values
+        self.start, self.end = 0, size
 
-    @property
-    def spread(self) -> float:
-        return self.best_ask - self.best_bid
+    def extend(self, ts_ns: List[int], *columns: List[float]) -> None:
+        count = len(ts_ns)
+        if not count:
+            return
+        self._reserve(count)
+        end = self.end + count
+        self.ts[self.end : end] = ts_ns
+        for row, column in zip(self.values, columns):
+            row[self.end : end] = column
+        self.end = end
+        self.appended += count
+
+    def content_key(self) -> Tuple[int, int]:
+        # History only grows at the end and shrinks at the front, so the total
+        # number of appends plus the live length identifies the live contents.
+        return self.appended, len(self)
+
+    def trim(self, cutoff_ns: int) -> None:
+        # Drop leading samples older than the cutoff, like popping a deque from the left.
+        fresh = self.live_ts() >= cutoff_ns
+        if fresh.size and not fresh[0]:
+            self.start += int(np.argmax(fresh)) if fresh.any() else fresh.size
+
+    def window(self, cutoff_ns: int) -> np.ndarray:
+        # Samples can arrive out of timestamp order (REST pages), so select by mask.
+        return self.live_ts() >= cutoff_ns
+
+
+_PRICE, _SIZE = 0, 1
+_MID, _SPREAD = 0, 1
+
+
+def _volume_kernel(ts: np.ndarray, size: np.ndarray, cutoffs_ns: np.ndarray) -> Tuple[np.ndarray, float]:
+    # All window sums via one (windows x trades) mask and a dot product; the last
+    # two cutoffs are baseline and churn and stay out of the spike z-score.
+    volumes = (ts[np.newaxis, :] >= cutoffs_ns[:, np.newaxis]) @ size
+    spike_volumes = volumes[:-2]
+    baseline_std = spike_volumes.std() if spike_volumes.size > 1 else 0.0
+    if baseline_std == 0:
+        return volumes, 0.0
+    return volumes, float(((spike_volumes - spike_volumes.mean()) / baseline_std).max())
 
 
 class AnomalyDetector:
@@ -34,113 +134,123 @@ class AnomalyDetector:
         self.repeat_print_window_sec = repeat_print_window_sec
         self.spread_window_sec = spread_window_sec
         self.imbalance_depth_levels = imbalance_depth_levels
-        self.trade_history: Dict[str, Deque[Trade]] = defaultdict(deque)
-        self.mid_history: Dict[str, Deque[Tuple[datetime, float]]] = defaultdict(deque)
-        self.spread_history: Dict[str, Deque[Tuple[datetime, float]]] = defaultdict(deque)
+        # Every volume score() needs: the spike windows, then baseline and churn.
+        self._volume_windows_ns = np.array(
+            [*volume_windows_sec, baseline_window_sec, churn_window_sec], dtype=np.int64
+        ) * 1_000_000_000
+        # Per market: trades as (price, size) and book samples as (mid, spread).
+        self.trade_history: Dict[str, _Series] = defaultdict(lambda: _Series(2))
+        self.book_history: Dict[str, _Series] = defaultdict(lambda: _Series(2))
         self.last_orderbook: Dict[str, OrderBookView] = {}
+        self._spread_medians: Dict[str, Tuple[Tuple[int, int], float]] = {}
+        # Markets updated since the caller last scored them; the caller discards entries.
+        self.dirty: Set[str] = set()
+
+    def _trim(self, market: str, now_ns: int) -> None:
+        cutoff_ns = now_ns - self.baseline_window_sec * 1_000_000_000
+        self.trade_history[market].trim(cutoff_ns)
+        self.book_history[market].trim(cutoff_ns)
 
-    def _trim(self, market: str, now: datetime) -> None:
-        cutoff = now - timedelta(seconds=self.baseline_window_sec)
-        trades = self.trade_history[market]
-        while trades and trades[0].timestamp < cutoff:
-            trades.popleft()
-        mids = self.mid_history[market]
-        while mids and mids[0][0] < cutoff:
-            mids.popleft()
-        spreads = self.spread_history[market]
-        while spreads and spreads[0][0] < cutoff:
-            spreads.popleft()
-
-    def update(self, market: str, trades: Iterable[Trade], orderbook: OrderBookView) -> None:
-        now = datetime.now(timezone.utc)
-        for trade in trades:
-            self.trade_history[market].append(trade)
+    def update(
+        self, market: str, trades: Iterable[Trade], orderbook: OrderBookView, now_ns: Optional[int] = None
+    ) -> None:
+        if now_ns is None:
+            now_ns = time.time_ns()
+        trades = list(trades)
+        if trades:
+            self.trade_history[market].extend(
+                [_to_ns(trade.timestamp) for trade in trades],
+                [trade.price for trade in trades],
+                [trade.size for trade in trades],
+            )
         if orderbook:
             self.last_orderbook[market] = orderbook
-            self.mid_history[market].append((now, orderbook.mid))
-            self.spread_history[market].append((now, orderbook.spread))
-        self._trim(market, now)
-
-    def _window_trades(self, market: str, window_sec: int) -> List[Trade]:
-        now = datetime.now(timezone.utc)
-        cutoff = now - timedelta(seconds=window_sec)
-        return [trade for trade in self.trade_history[market] if trade.timestamp >= cutoff]
-
-    def _volume(self, trades: Iterable[Trade]) -> float:
-        return sum(trade.size for trade in trades)
-
-    def _mid_delta(self, market: str, window_sec: int) -> float:
-        now = datetime.now(timezone.utc)
-        cutoff = now - timedelta(seconds=window_sec)
-        mids = [mid for ts, mid in self.mid_history[market] if ts >= cutoff]
-        if len(mids) < 2:
+            self.book_history[market].extend([now_ns], [orderbook.mid], [orderbook.spread])
+        self._trim(market, now_ns)
+        self.dirty.add(market)
+
+    def mid_delta(self, market: str, window_sec: int, now_ns: Optional[int] = None) -> float:
+        if now_ns is None:
+            now_ns = time.time_ns()
+        history = self.book_history[market]
+        selected = np.flatnonzero(history.window(now_ns - window_sec * 1_000_000_000))
+        if selected.size < 2:
             return 0.0
-        return mids[-1] - mids[0]
+        mids = history.live(_MID)
+        return float(mids[selected[-1]] - mids[selected[0]])
 
-    def _repeat_print_score(self, market: str) -> float:
-        now = datetime.now(timezone.utc)
-        cutoff = now - timedelta(seconds=self.repeat_print_window_sec)
-        recent = [trade for trade in self.trade_history[market] if trade.timestamp >= cutoff]
-        if not recent:
+    def _repeat_print_score(self, market: str, now_ns: int) -> float:
+        history = self.trade_history[market]
+        recent = history.window(now_ns - self.repeat_print_window_sec * 1_000_000_000)
+        total = int(np.count_nonzero(recent))
+        if not total:
             return 0.0
-        buckets: Dict[str, int] = defaultdict(int)
-        for trade in recent:
-            key = f"{trade.price:.4f}:{trade.size:.4f}"
-            buckets[key] += 1
-        repeats = [count for count in buckets.values() if count > 1]
-        if not repeats:
+        # Bucket prints by price and size at 4 decimal places, packed into one
+        # int64 key (size ticks as the low digit) so np.unique runs on a flat array.
+        price_ticks = np.rint(history.live(_PRICE)[recent] * 10_000).astype(np.int64)
+        size_ticks = np.rint(history.live(_SIZE)[recent] * 10_000).astype(np.int64)
+        size_ticks -= size_ticks.min()
+        keys = price_ticks * (int(size_ticks.max()) + 1) + size_ticks
+        _, counts = np.unique(keys, return_counts=True)
+        repeats = counts[counts > 1]
+        if not repeats.size:
             return 0.0
-        return min(1.0, sum(repeats) / len(recent))
+        return min(1.0, int(repeats.sum()) / total)
 
     def _spread_regime(self, market: str) -> float:
-        spreads = [spread for _, spread in self.spread_history[market]]
-        if not spreads:
+        history = self.book_history[market]
+        spreads = history.live(_SPREAD)
+        if not spreads.size:
             return 0.0
-        median = sorted(spreads)[len(spreads) // 2]
-        current = spreads[-1]
+        key = history.content_key()
+        cached = self._spread_medians.get(market)
+        if cached is not None and cached[0] == key:
+            median = cached[1]
+        else:
+            # Upper median via introselect: O(n) instead of a full sort.
+            k = spreads.size // 2
+            median = float(np.partition(spreads, k)[k])
+            self._spread_medians[market] = (key, median)
+        current = float(spreads[-1])
         if median == 0:
             return 0.0
         return min(1.0, current / median)
 
     def _orderbook_imbalance(self, orderbook: OrderBookView) -> float:
-        bid_depth = sum(size for _, size in orderbook.bids[: self.imbalance_depth_levels])
-        ask_depth = sum(size for _, size in orderbook.asks[: self.imbalance_depth_levels])
+        if orderbook.depth_levels == self.imbalance_depth_levels:
+            bid_depth, ask_depth = orderbook.bid_depth, orderbook.ask_depth
+        else:
+            bid_depth = sum(size for _, size in orderbook.bids[: self.imbalance_depth_levels])
+            ask_depth = sum(size for _, size in orderbook.asks[: self.imbalance_depth_levels])
         total = bid_depth + ask_depth
         if total == 0:
             return 0.0
         return (bid_depth - ask_depth) / total
 
-    def score(self, market: str, orderbook: OrderBookView) -> Tuple[float, Dict[str, float]]:
-        now = datetime.now(timezone.utc)
-        self._trim(market, now)
+    def score(
+        self, market: str, orderbook: OrderBookView, now_ns: Optional[int] = None
+    ) -> Tuple[float, Dict[str, float]]:
+        # One clock read per score(); every window below is measured from it.
+        if now_ns is None:
+            now_ns = time.time_ns()
+        self._trim(market, now_ns)
         explain: Dict[str, float] = {}
 
-        baseline_trades = self._window_trades(market, self.baseline_window_sec)
-        baseline_volume = self._volume(baseline_trades)
-        baseline_volumes = []
-        for window in self.volume_windows_sec:
-            window_trades = self._window_trades(market, window)
-            volume = self._volume(window_trades)
-            baseline_volumes.append(volume)
+        history = self.trade_history[market]
+        volumes, volume_spike_z = _volume_kernel(
+            history.live_ts(), history.live(_SIZE), now_ns - self._volume_windows_ns
+        )
+        volumes = volumes.tolist()
+        baseline_volume, churn_volume = volumes[-2:]
+        for window, volume in zip(self.volume_windows_sec, volumes[:-2]):
             explain[f"volume_{window}s"] = volume
-        baseline_mean = mean(baseline_volumes) if baseline_volumes else 0.0
-        baseline_std = pstdev(baseline_volumes) if len(baseline_volumes) > 1 else 0.0
-        z_scores = []
-        for volume in baseline_volumes:
-            if baseline_std == 0:
-                z_scores.append(0.0)
-            else:
-                z_scores.append((volume - baseline_mean) / baseline_std)
-        volume_spike_z = max(z_scores) if z_scores else 0.0
         explain["volume_spike_z"] = volume_spike_z
 
-        churn_trades = self._window_trades(market, self.churn_window_sec)
-        churn_volume = self._volume(churn_trades)
-        churn_mid_delta = abs(self._mid_delta(market, self.churn_window_sec))
+        churn_mid_delta = abs(self.mid_delta(market, self.churn_window_sec, now_ns))
         churn_ratio = churn_volume / churn_mid_delta if churn_mid_delta else 0.0
         explain["churn_ratio"] = churn_ratio
 
-        repeat_print_score = self._repeat_print_score(market)
+        repeat_print_score = self._repeat_print_score(market, now_ns)
         explain["repeat_print_score"] = repeat_print_score
 
         impact_per_volume = churn_mid_delta / churn_volume if churn_volume else 0.0
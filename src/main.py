@@ -1,46 +1,53 @@
-import json
+import sqlite3
+import sys
 import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict
 from datetime import datetime, timezone
-from typing import Dict, List, Optional
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+import orjson
 
 from src.alerts.discord_alerter import DiscordAlerter
 from src.config import load_config
 from src.data.polymarket_client import PolymarketClient
 from src.data.storage import OrderBookSnapshot, SignalRecord, SqliteStorage, Trade
-from src.execution.execution_engine import ExecutionEngine
+from src.execution.execution_engine import ExecutionEngine, OrderResponse
 from src.execution.wallet_signer import ExternalWalletSigner, PrivateKeyEnvSigner, WalletSigner
 from src.features.anomaly_detector import AnomalyDetector, OrderBookView
 from src.data.polymarket_client import TradePrint, OrderBook
 from src.risk.risk_manager import RiskManager
-from src.strategy.fade_strategy import FadeStrategy
+from src.strategy.fade_strategy import FadeStrategy, FeaturesView
 
 
 def _select_markets(client: PolymarketClient, allowlist: List[str], top_n: Optional[int]) -> List[str]:
+    # Market ids key every per-market dict downstream; interning them here lets
+    # those lookups match on identity instead of comparing string contents.
     if allowlist:
-        return allowlist
+        return [sys.intern(m) for m in allowlist]
     markets = client.list_markets(limit=top_n or 200)
     markets = [m for m in markets if m.status.lower() == "active"]
     markets.sort(key=lambda m: m.volume, reverse=True)
     if top_n:
         markets = markets[:top_n]
-    return [m.market_id for m in markets]
+    return [sys.intern(m.market_id) for m in markets]
 
 
-def _parse_orderbook(orderbook_payload: Dict[str, List[List[float]]]) -> OrderBookView:
+def _parse_orderbook(orderbook_payload: Dict[str, List[List[float]]], depth_levels: int = 0) -> OrderBookView:
     bids = [(float(price), float(size)) for price, size in orderbook_payload.get("bids", [])]
     asks = [(float(price), float(size)) for price, size in orderbook_payload.get("asks", [])]
-    best_bid = bids[0][0] if bids else 0.0
-    best_ask = asks[0][0] if asks else 0.0
-    return OrderBookView(best_bid=best_bid, best_ask=best_ask, bids=bids, asks=asks)
+    return OrderBookView.from_levels(bids, asks, depth_levels)
+
+
+def _serialize_levels(levels: Sequence[Sequence[Any]]) -> str:
+    return orjson.dumps(levels).decode("utf-8")
 
 
-def _short_move(detector: AnomalyDetector, market: str, window_sec: int = 60) -> float:
-    now = datetime.now(timezone.utc)
-    cutoff = now.timestamp() - window_sec
-    history = [mid for ts, mid in detector.mid_history[market] if ts.timestamp() >= cutoff]
-    if len(history) < 2:
-        return 0.0
-    return history[-1] - history[0]
+def _short_move(
+    detector: AnomalyDetector, market: str, window_sec: int = 60, now_ns: Optional[int] = None
+) -> float:
+    return detector.mid_delta(market, window_sec, now_ns)
 
 
 def _build_wallet_signer(mode: str, polymarket_config) -> Optional[WalletSigner]:
@@ -68,6 +75,46 @@ def _resolve_order_size(config) -> float:
     return balance * percent
 
 
+def _report_order(alerter: DiscordAlerter, market: str, future: "Future[OrderResponse]") -> None:
+    try:
+        order_response = future.result()
+    except Exception as e:
+        alerter.enqueue("ORDER", {"market": market, "status": "error", "error": str(e)})
+        return
+    alerter.enqueue(
+        "ORDER",
+        {
+            "market": market,
+            "order_id": order_response.order_id,
+            "status": order_response.status,
+            "payload": order_response.payload,
+        },
+    )
+
+
+def _apply_updates(
+    detector: AnomalyDetector, buffer: Deque[Tuple[str, List[Trade], Optional[OrderBookView], int]]
+) -> None:
+    for _ in range(len(buffer)):
+        market, trades, view, received_ns = buffer.popleft()
+        if view is None:
+            view = detector.last_orderbook.get(market)
+        detector.update(market, trades, view, received_ns)
+
+
+def _drain(buffer: Deque[Any], write: Callable[[List[Any]], int]) -> None:
+    if not buffer:
+        return
+    # popleft is atomic, so producers can keep appending while we drain.
+    batch = [buffer.popleft() for _ in range(len(buffer))]
+    try:
+        write(batch)
+    except sqlite3.Error as e:
+        # Keep the rows for the next tick instead of losing them with the loop.
+        print(f"[WARN] Storage write failed, retrying next tick: {e}")
+        buffer.extendleft(reversed(batch))
+
+
 def run() -> None:
     config = load_config("config.yaml")
     storage = SqliteStorage("data.sqlite")
@@ -89,6 +136,9 @@ def run() -> None:
         imbalance_depth_levels=config.detector.imbalance_depth_levels,
     )
 
+    # Book depth for the imbalance feature is summed once when a book is parsed.
+    depth_levels = config.detector.imbalance_depth_levels
+
     strategy = FadeStrategy(
         anomaly_threshold=config.strategy.anomaly_threshold,
         min_impact_per_volume=config.strategy.min_impact_per_volume,
@@ -125,9 +175,20 @@ def run() -> None:
         batch_size=config.alerts.batch_size,
     )
 
+    # Orders are signed and sent on one worker while the loop keeps scoring the
+    # remaining markets. Only one order is in flight at a time: anything queued
+    # behind rate-limit sleeps and retries would go out at a stale price.
+    order_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="orders")
+    order_in_flight: Optional["Future[OrderResponse]"] = None
+
     markets = _select_markets(client, config.allowlist_markets, config.top_n_by_volume)
     alerter.enqueue("HEALTH", {"event": "startup", "markets": markets, "mode": config.trading_mode})
-    alerter.flush()
+
+    # WS callbacks run off the main thread, so they only buffer rows and detector
+    # updates; the loop drains them, keeping SQLite and the detector single-threaded.
+    pending_trades: Deque[Trade] = deque()
+    pending_books: Deque[OrderBookSnapshot] = deque()
+    pending_updates: Deque[Tuple[str, List[Trade], Optional[OrderBookView], int]] = deque()
 
     def on_trade(trade: TradePrint):
         trade_model = Trade(
@@ -138,20 +199,20 @@ def run() -> None:
             side=trade.side,
             timestamp=trade.timestamp,
         )
-        storage.insert_trades([trade_model])
-        detector.update(trade.market_id, [trade_model], detector.last_orderbook.get(trade.market_id))
+        pending_trades.append(trade_model)
+        pending_updates.append((trade.market_id, [trade_model], None, time.time_ns()))
 
     def on_orderbook(ob: OrderBook):
-        storage.insert_orderbook(
+        pending_books.append(
             OrderBookSnapshot(
                 market=ob.market_id,
                 timestamp=ob.timestamp,
-                bids=json.dumps(ob.bids),
-                asks=json.dumps(ob.asks),
+                bids=_serialize_levels(ob.bids),
+                asks=_serialize_levels(ob.asks),
             )
         )
-        view = _parse_orderbook({"bids": ob.bids, "asks": ob.asks})
-        detector.update(ob.market_id, [], view)
+        view = _parse_orderbook({"bids": ob.bids, "asks": ob.asks}, depth_levels)
+        pending_updates.append((ob.market_id, [], view, time.time_ns()))
 
     # Initialize detector last_orderbook if not present
     if not hasattr(detector, "last_orderbook"):
@@ -169,12 +230,17 @@ def run() -> None:
 
     try:
         while True:
+            _apply_updates(detector, pending_updates)
+            _drain(pending_trades, storage.insert_trades)
+            _drain(pending_books, storage.insert_orderbooks)
             for market in markets:
                 # REST polling for data (fallback or primary if WS not used)
                 if not use_ws or not detector.last_orderbook.get(market):
                     try:
                         orderbook_payload = client.get_orderbook(market)
-                        orderbook_view = _parse_orderbook({"bids": orderbook_payload.bids, "asks": orderbook_payload.asks})
+                        orderbook_view = _parse_orderbook(
+                            {"bids": orderbook_payload.bids, "asks": orderbook_payload.asks}, depth_levels
+                        )
                         detector.last_orderbook[market] = orderbook_view
                         trades = client.get_recent_trades(market, limit=50)
                         trade_models = [
@@ -197,23 +263,33 @@ def run() -> None:
                 if not orderbook_view:
                     continue
 
-                score, features = detector.score(market, orderbook_view)
-                short_move = _short_move(detector, market)
+                # Nothing arrived since the last score: skip the windowed aggregates.
+                if market not in detector.dirty:
+                    continue
+                detector.dirty.discard(market)
+
+                now_ns = time.time_ns()
+                score, features = detector.score(market, orderbook_view, now_ns)
+                short_move = _short_move(detector, market, now_ns=now_ns)
                 signal = strategy.generate_signal(
                     market=market,
                     mid=orderbook_view.mid,
                     short_move=short_move,
                     score=score,
-                    features=features,
+                    features=FeaturesView(impact_per_volume=features["impact_per_volume"]),
                     order_size=order_size,
                 )
 
+                if signal:
+                    # Stored and alerted features carry the signal's ATR/TP/SL next to the detector's.
+                    features.update(asdict(signal.features))
+
                 storage.insert_signal(
                     SignalRecord(
                         market=market,
                         timestamp=datetime.now(timezone.utc),
                         score=score,
-                        payload=json.dumps(features),
+                        payload=orjson.dumps(features).decode("utf-8"),
                     )
                 )
 
@@ -225,10 +301,12 @@ def run() -> None:
                             "side": signal.side,
                             "price": signal.price,
                             "score": signal.score,
-                            "features": signal.features,
+                            "features": features,
                         },
                     )
-                    if risk.check_order(signal.market, signal.size, signal.price):
+                    if order_in_flight is not None and not order_in_flight.done():
+                        alerter.enqueue("RISK", {"market": signal.market, "reason": "order_in_flight"})
+                    elif risk.check_order(signal.market, signal.size, signal.price):
                         payload = {
                             "market": signal.market,
                             "side": signal.side,
@@ -236,24 +314,27 @@ def run() -> None:
                             "size": signal.size,
                             "type": "limit",
                         }
-                        order_response = execution.place_order(payload)
+                        order_in_flight = order_pool.submit(execution.place_order, payload)
                         risk.record_order()
-                        alerter.enqueue(
-                            "ORDER",
-                            {
-                                "market": signal.market,
-                                "order_id": order_response.order_id,
-                                "status": order_response.status,
-                                "payload": order_response.payload,
-                            },
+                        order_in_flight.add_done_callback(
+                            lambda f, market=signal.market: _report_order(alerter, market, f)
                         )
                     else:
                         alerter.enqueue("RISK", {"market": signal.market, "reason": "risk_block"})
-                alerter.flush()
+                    # Everything above copied what it needed out of the signal.
+                    strategy.release(signal)
+            # Writes only check the commit interval when they happen; check it every
+            # tick too so quiet periods do not leave rows uncommitted.
+            storage.flush()
             time.sleep(config.data_poll_sec)
     finally:
         if use_ws:
             client.stop_ws()
+        order_pool.shutdown(wait=True)
+        _drain(pending_trades, storage.insert_trades)
+        _drain(pending_books, storage.insert_orderbooks)
+        storage.close()
+        alerter.close()
 
 
 if __name__ == "__main__":
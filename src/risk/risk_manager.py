@@ -1,7 +1,8 @@
+import os
+import time
+from collections import deque
 from dataclasses import dataclass, field
-from datetime import datetime, timezone
-from pathlib import Path
-from typing import Dict
+from typing import Deque, Dict
 
 
 @dataclass
@@ -14,8 +15,10 @@ class MarketExposure:
 class RiskState:
     exposures: Dict[str, MarketExposure] = field(default_factory=dict)
     realized_pnl: float = 0.0
-    orders_last_minute: int = 0
-    last_reset: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    # Sum of abs(position) over all exposures, kept in step by record_fill.
+    total_abs_position: float = 0.0
+    # Monotonic send times of orders in the trailing minute, oldest first.
+    order_ts: Deque[float] = field(default_factory=deque)
 
 
 class RiskManager:
@@ -26,36 +29,44 @@ class RiskManager:
         max_daily_loss: float,
         max_orders_per_minute: int,
         kill_switch_file: str = "KILL_SWITCH",
+        kill_switch_ttl_sec: float = 1.0,
     ) -> None:
         self.max_position_per_market = max_position_per_market
         self.max_global_exposure = max_global_exposure
         self.max_daily_loss = max_daily_loss
         self.max_orders_per_minute = max_orders_per_minute
         self.kill_switch_file = kill_switch_file
+        # The kill switch file is stat'ed at most once per TTL instead of on every check.
+        self.kill_switch_ttl_sec = kill_switch_ttl_sec
         self.state = RiskState()
+        self._kill_switch_checked = float("-inf")
+        self._kill_switch_value = False
 
-    def _reset_rate_limit(self) -> None:
-        now = datetime.now(timezone.utc)
-        delta = (now - self.state.last_reset).total_seconds()
-        if delta >= 60:
-            self.state.orders_last_minute = 0
-            self.state.last_reset = now
+    def _expire_orders(self, now: float) -> None:
+        order_ts = self.state.order_ts
+        cutoff = now - 60
+        while order_ts and order_ts[0] <= cutoff:
+            order_ts.popleft()
 
     def kill_switch_active(self) -> bool:
-        return Path(self.kill_switch_file).exists()
+        now = time.monotonic()
+        if now - self._kill_switch_checked >= self.kill_switch_ttl_sec:
+            self._kill_switch_value = os.path.exists(self.kill_switch_file)
+            self._kill_switch_checked = now
+        return self._kill_switch_value
 
     def check_order(self, market: str, size: float, price: float) -> bool:
         if self.kill_switch_active():
             return False
-        self._reset_rate_limit()
-        if self.state.orders_last_minute >= self.max_orders_per_minute:
+        self._expire_orders(time.monotonic())
+        if len(self.state.order_ts) >= self.max_orders_per_minute:
             return False
         exposure = self.state.exposures.get(market, MarketExposure())
         projected_position = exposure.position + size
         projected_notional = abs(projected_position * price)
         if projected_notional > self.max_position_per_market:
             return False
-        total_exposure = sum(abs(exp.position) for exp in self.state.exposures.values()) + abs(size)
+        total_exposure = self.state.total_abs_position + abs(size)
         if total_exposure > self.max_global_exposure:
             return False
         if self.state.realized_pnl <= -abs(self.max_daily_loss):
@@ -63,14 +74,17 @@ class RiskManager:
         return True
 
     def record_order(self) -> None:
-        self._reset_rate_limit()
-        self.state.orders_last_minute += 1
+        now = time.monotonic()
+        self._expire_orders(now)
+        self.state.order_ts.append(now)
 
     def record_fill(self, market: str, filled_size: float, price: float, pnl: float) -> None:
         exposure = self.state.exposures.get(market)
         if exposure is None:
             exposure = MarketExposure()
             self.state.exposures[market] = exposure
+        old_position = exposure.position
         exposure.position += filled_size
+        self.state.total_abs_position += abs(exposure.position) - abs(old_position)
         exposure.notional = exposure.position * price
         self.state.realized_pnl += pnl
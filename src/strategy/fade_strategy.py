@@ -1,9 +1,33 @@
-from collections import deque
+import sys
 from dataclasses import dataclass
-from typing import Deque, Dict, Optional
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
 
+import numpy as np
 
-@dataclass
+from src.config import StrategyConfig
+
+# Entry price offset from mid, applied against the fade direction.
+_ENTRY_OFFSET = 0.0005
+_SIGNAL_REASON = "fade_micro_move_atr"
+_SIGNAL_POOL_SIZE = 64
+
+
+class FeaturesView(NamedTuple):
+    # The detector features generate_signal reads.
+    impact_per_volume: float = 0.0
+
+
+@dataclass(frozen=True, slots=True)
+class SignalFeatures:
+    atr: float
+    tp_price: float
+    sl_price: float
+
+    def __getitem__(self, key: str) -> float:
+        return getattr(self, key)
+
+
+@dataclass(slots=True)
 class Signal:
     market: str
     side: str
@@ -11,7 +35,53 @@ class Signal:
     size: float
     reason: str
     score: float
-    features: Dict[str, float]
+    features: SignalFeatures
+
+
+@dataclass(frozen=True, slots=True)
+class _PreflightConstants:
+    thresh: float
+    min_ipv: float
+    tp_frac: float
+    sl_frac: float
+    atr_mult_tp: float = 2.0
+    atr_mult_sl: float = 1.5
+
+
+@dataclass
+class SignalBatch:
+    # Row i describes markets[index[i]] from the generate_signals_batch call.
+    index: np.ndarray
+    side: np.ndarray
+    price: np.ndarray
+    tp_price: np.ndarray
+    sl_price: np.ndarray
+    atr: np.ndarray
+
+
+def _make_compute(side_sign: float, k: _PreflightConstants) -> Callable[[float, float], Tuple[float, float, float]]:
+    # Builds (mid, atr) -> (price, tp_price, sl_price) for one side, with that side's
+    # constants folded in up front. side_sign is +1.0 for buys and -1.0 for sells.
+    # Entry is a small offset from mid against the move.
+    entry_mult = 1 + side_sign * _ENTRY_OFFSET
+    # Default to BPS if ATR is 0 or not enough data
+    tp_mult = 1 + side_sign * k.tp_frac
+    sl_mult = 1 - side_sign * k.sl_frac
+    # TP at 2.0 * ATR, SL at 1.5 * ATR (example); buys take max/min, sells min/max.
+    tp_step = side_sign * k.atr_mult_tp
+    sl_step = side_sign * k.atr_mult_sl
+    pick_tp, pick_sl = (max, min) if side_sign > 0 else (min, max)
+
+    def compute(mid: float, atr: float) -> Tuple[float, float, float]:
+        price = mid * entry_mult
+        tp_price = price * tp_mult
+        sl_price = price * sl_mult
+        if atr > 0:
+            tp_price = pick_tp(tp_price, price + tp_step * atr)
+            sl_price = pick_sl(sl_price, price - sl_step * atr)
+        return price, tp_price, sl_price
+
+    return compute
 
 
 class FadeStrategy:
@@ -24,27 +94,112 @@ class FadeStrategy:
         time_stop_min: int,
         atr_window: int = 14,
     ) -> None:
+        self._knobs: Optional[Tuple[float, float, int, int, int, int]] = None
+        # Retired Signals handed back through release(), reused by generate_signal.
+        self._signal_pool: List[Signal] = []
+        self._set_knobs(
+            anomaly_threshold, min_impact_per_volume, take_profit_bps, stop_loss_bps, time_stop_min, atr_window
+        )
+
+    def _set_knobs(
+        self,
+        anomaly_threshold: float,
+        min_impact_per_volume: float,
+        take_profit_bps: int,
+        stop_loss_bps: int,
+        time_stop_min: int,
+        atr_window: int,
+    ) -> None:
+        knobs = (anomaly_threshold, min_impact_per_volume, take_profit_bps, stop_loss_bps, time_stop_min, atr_window)
+        if knobs == self._knobs:
+            return
+        resize_atr = self._knobs is None or atr_window != self.atr_window
+        self._knobs = knobs
         self.anomaly_threshold = anomaly_threshold
         self.min_impact_per_volume = min_impact_per_volume
         self.take_profit_bps = take_profit_bps
         self.stop_loss_bps = stop_loss_bps
         self.time_stop_min = time_stop_min
         self.atr_window = atr_window
-        self.price_history: Dict[str, Deque[float]] = {}
+        # Everything generate_signal derives from the knobs, computed once per change.
+        self._k = _PreflightConstants(
+            thresh=anomaly_threshold,
+            min_ipv=min_impact_per_volume,
+            tp_frac=take_profit_bps / 10000,
+            sl_frac=stop_loss_bps / 10000,
+        )
+        self._compute_buy = _make_compute(1.0, self._k)
+        self._compute_sell = _make_compute(-1.0, self._k)
+        if resize_atr:
+            self._reset_atr()
 
-    def _update_atr(self, market: str, price: float) -> float:
-        if market not in self.price_history:
-            self.price_history[market] = deque(maxlen=self.atr_window + 1)
-        self.price_history[market].append(price)
-        if len(self.price_history[market]) < 2:
-            return 0.0
-        
+    def reload(self, config: StrategyConfig) -> None:
+        # Cheap when the strategy knobs are unchanged; ATR history is only
+        # dropped if atr_window itself changes.
+        self._set_knobs(
+            config.anomaly_threshold,
+            config.min_impact_per_volume,
+            config.take_profit_bps,
+            config.stop_loss_bps,
+            config.time_stop_min,
+            config.atr_window,
+        )
+
+    def _reset_atr(self) -> None:
+        # Per-market ATR state, one row per market: the last price, a ring of the
+        # last atr_window absolute returns, the next slot to overwrite, how many
+        # slots are filled, and the running sum of the ring.
+        self._market_idx: Dict[str, int] = {}
+        self._last_prices = np.empty(0, dtype=np.float64)
+        self._abs_returns = np.empty((0, self.atr_window), dtype=np.float64)
+        self._heads = np.empty(0, dtype=np.int64)
+        self._counts = np.empty(0, dtype=np.int64)
+        self._sums = np.empty(0, dtype=np.float64)
+
+    def _add_market(self, market: str) -> int:
+        idx = len(self._market_idx)
+        capacity = self._sums.size
+        if idx == capacity:
+            # Grow every column in power-of-two steps so adding markets is amortized O(1).
+            capacity = max(8, capacity * 2)
+            self._last_prices = np.resize(self._last_prices, capacity)
+            self._abs_returns = np.resize(self._abs_returns, (capacity, self.atr_window))
+            self._heads = np.resize(self._heads, capacity)
+            self._counts = np.resize(self._counts, capacity)
+            self._sums = np.resize(self._sums, capacity)
+        self._abs_returns[idx] = 0.0
+        self._heads[idx] = 0
+        self._counts[idx] = 0
+        self._sums[idx] = 0.0
+        self._market_idx[sys.intern(market)] = idx
+        return idx
+
+    def _record_price(self, market: str, price: float) -> int:
+        idx = self._market_idx.get(market)
+        if idx is None:
+            idx = self._add_market(market)
+            self._last_prices[idx] = price
+            return idx
+        prev_price = self._last_prices.item(idx)
+        self._last_prices[idx] = price
+
+        head = self._heads.item(idx)
+        dr = abs(price - prev_price)
+        # Unfilled slots are zero, so subtracting the evicted slot is always safe.
+        total = self._sums.item(idx) - self._abs_returns.item(idx, head) + dr
+        self._abs_returns[idx, head] = dr
+        count = min(self._counts.item(idx) + 1, self.atr_window)
+        self._heads[idx] = (head + 1) % self.atr_window
+        self._counts[idx] = count
+        self._sums[idx] = total
+        return idx
+
+    def _atr(self, idx: int) -> float:
         # Simple ATR-like proxy: mean of absolute returns over window
-        returns = []
-        prices = list(self.price_history[market])
-        for i in range(1, len(prices)):
-            returns.append(abs(prices[i] - prices[i-1]))
-        return sum(returns) / len(returns)
+        count = self._counts.item(idx)
+        if not count:
+            return 0.0
+        return self._sums.item(idx) / count
 
     def generate_signal(
         self,
@@ -52,50 +207,114 @@ class FadeStrategy:
         mid: float,
         short_move: float,
         score: float,
-        features: Dict[str, float],
+        features: Union[FeaturesView, Dict[str, float]],
         order_size: float,
     ) -> Optional[Signal]:
-        atr = self._update_atr(market, mid)
-        
-        if score < self.anomaly_threshold:
+        # Every tick feeds the ATR history; only ticks that pass the gates pay
+        # for the ATR mean and the signal math below.
+        idx = self._record_price(market, mid)
+        k = self._k
+        if score < k.thresh:
             return None
-        impact_per_volume = features.get("impact_per_volume", 0.0)
-        if impact_per_volume > self.min_impact_per_volume:
+        if type(features) is FeaturesView:
+            impact_per_volume = features.impact_per_volume
+        else:
+            impact_per_volume = features.get("impact_per_volume", 0.0)
+        if impact_per_volume > k.min_ipv:
             return None
         if short_move == 0:
             return None
             
-        side = "sell" if short_move > 0 else "buy"
-        
-        # Volatility-adjusted price offset (optional)
-        # Here we just use a small offset from mid
-        price = mid * (1 + (-0.0005 if side == "sell" else 0.0005))
-        
-        # Calculate dynamic SL/TP if ATR is available
-        # Default to BPS if ATR is 0 or not enough data
-        tp_price = price * (1 + (self.take_profit_bps / 10000 if side == "buy" else -self.take_profit_bps / 10000))
-        sl_price = price * (1 - (self.stop_loss_bps / 10000 if side == "buy" else -self.stop_loss_bps / 10000))
+        atr = self._atr(idx)
+        if short_move > 0:
+            side = "sell"
+            price, tp_price, sl_price = self._compute_sell(mid, atr)
+        else:
+            side = "buy"
+            price, tp_price, sl_price = self._compute_buy(mid, atr)
 
-        if atr > 0:
-            # TP at 2.0 * ATR, SL at 1.5 * ATR (example)
-            if side == "buy":
-                tp_price = max(tp_price, price + 2.0 * atr)
-                sl_price = min(sl_price, price - 1.5 * atr)
-            else:
-                tp_price = min(tp_price, price - 2.0 * atr)
-                sl_price = max(sl_price, price + 1.5 * atr)
-
-        reason = "fade_micro_move_atr"
-        features["atr"] = atr
-        features["tp_price"] = tp_price
-        features["sl_price"] = sl_price
-
-        return Signal(
-            market=market,
-            side=side,
+        signal_features = SignalFeatures(atr=atr, tp_price=tp_price, sl_price=sl_price)
+        if not self._signal_pool:
+            # Positional: field order is market, side, price, size, reason, score, features.
+            return Signal(market, side, price, order_size, _SIGNAL_REASON, score, signal_features)
+        signal = self._signal_pool.pop()
+        signal.market = market
+        signal.side = side
+        signal.price = price
+        signal.size = order_size
+        signal.reason = _SIGNAL_REASON
+        signal.score = score
+        signal.features = signal_features
+        return signal
+
+    def generate_signals_batch(
+        self,
+        markets: Sequence[str],
+        mids: np.ndarray,
+        moves: np.ndarray,
+        scores: np.ndarray,
+        ipvs: np.ndarray,
+    ) -> SignalBatch:
+        # Same gates and levels as generate_signal, one NumPy pass over many
+        # markets at once. Markets must be distinct within a call.
+        mids = np.asarray(mids, dtype=np.float64)
+        moves = np.asarray(moves, dtype=np.float64)
+        idx = self._record_prices(markets, mids)
+
+        k = self._k
+        selected = np.flatnonzero(
+            (np.asarray(scores) >= k.thresh) & (np.asarray(ipvs) <= k.min_ipv) & (moves != 0)
+        )
+        rows = idx[selected]
+        counts = self._counts[rows]
+        atr = np.where(counts > 0, self._sums[rows] / np.maximum(counts, 1), 0.0)
+        side_sign = np.where(moves[selected] > 0, -1.0, 1.0)
+        price = mids[selected] * (1 + side_sign * _ENTRY_OFFSET)
+        tp_price = price * (1 + side_sign * k.tp_frac)
+        sl_price = price * (1 - side_sign * k.sl_frac)
+        has_atr = atr > 0
+        tp_price = np.where(
+            has_atr,
+            side_sign * np.maximum(side_sign * tp_price, side_sign * (price + side_sign * k.atr_mult_tp * atr)),
+            tp_price,
+        )
+        sl_price = np.where(
+            has_atr,
+            side_sign * np.minimum(side_sign * sl_price, side_sign * (price - side_sign * k.atr_mult_sl * atr)),
+            sl_price,
+        )
+        return SignalBatch(
+            index=selected,
+            side=np.where(side_sign > 0, "buy", "sell"),
             price=price,
-            size=order_size,
-            reason=reason,
-            score=score,
-            features=features,
+            tp_price=tp_price,
+            sl_price=sl_price,
+            atr=atr,
         )
+
+    def _record_prices(self, markets: Sequence[str], mids: np.ndarray) -> np.ndarray:
+        idx = np.empty(len(markets), dtype=np.int64)
+        seen = np.ones(len(markets), dtype=bool)
+        for i, market in enumerate(markets):
+            row = self._market_idx.get(market)
+            if row is None:
+                row = self._add_market(market)
+                seen[i] = False
+            idx[i] = row
+        rows = idx[seen]
+        prev_prices = self._last_prices[rows]
+        self._last_prices[idx] = mids
+        if rows.size:
+            # Same update as _record_price, applied to every known market at once.
+            heads = self._heads[rows]
+            dr = np.abs(mids[seen] - prev_prices)
+            self._sums[rows] = self._sums[rows] - self._abs_returns[rows, heads] + dr
+            self._abs_returns[rows, heads] = dr
+            self._counts[rows] = np.minimum(self._counts[rows] + 1, self.atr_window)
+            self._heads[rows] = (heads + 1) % self.atr_window
+        return idx
+
+    def release(self, signal: Signal) -> None:
+        # Only call once nothing else holds the signal; its fields get overwritten.
+        if len(self._signal_pool) < _SIGNAL_POOL_SIZE:
+            self._signal_pool.append(signal)
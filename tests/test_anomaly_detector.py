@@ -0,0 +1,84 @@
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+
+from src.data.storage import Trade
+from src.features.anomaly_detector import AnomalyDetector, OrderBookView
+from src.main import _apply_updates
+
+
+def _detector() -> AnomalyDetector:
+    return AnomalyDetector(
+        volume_windows_sec=[60, 300],
+        baseline_window_sec=1800,
+        churn_window_sec=300,
+        repeat_print_window_sec=120,
+        spread_window_sec=300,
+        imbalance_depth_levels=5,
+    )
+
+
+def _trade(trade_id: str, price: float, size: float, age_sec: float) -> Trade:
+    return Trade(
+        market="m1",
+        trade_id=trade_id,
+        price=price,
+        size=size,
+        side="buy",
+        timestamp=datetime.now(timezone.utc) - timedelta(seconds=age_sec),
+    )
+
+
+def test_score_windows_and_repeat_prints():
+    detector = _detector()
+    book = OrderBookView(best_bid=0.49, best_ask=0.51, bids=[(0.49, 30.0)], asks=[(0.51, 10.0)])
+    trades = [
+        # Older than the baseline window: trimmed on update.
+        _trade("t0", 0.5, 50.0, 3600),
+        _trade("t1", 0.52, 1.0, 200),
+        _trade("t2", 0.5, 2.0, 30),
+        _trade("t3", 0.5, 2.0, 10),
+    ]
+    detector.update("m1", trades, book)
+    score, explain = detector.score("m1", book)
+
+    assert explain["volume_60s"] == 4.0
+    assert explain["volume_300s"] == 5.0
+    assert explain["repeat_print_score"] == 1.0
+    assert explain["orderbook_imbalance"] == 0.5
+    assert 0.0 <= score <= 1.0
+    assert len(detector.trade_history["m1"]) == 3
+
+    precomputed = OrderBookView.from_levels(book.bids, book.asks, detector.imbalance_depth_levels)
+    assert precomputed.bid_depth == 30.0
+    assert detector.score("m1", precomputed)[1]["orderbook_imbalance"] == 0.5
+
+
+def test_mid_delta_tracks_book_updates():
+    detector = _detector()
+    detector.update("m1", [], OrderBookView(best_bid=0.40, best_ask=0.42, bids=[], asks=[]))
+    assert detector.mid_delta("m1", 60) == 0.0
+    detector.update("m1", [], OrderBookView(best_bid=0.44, best_ask=0.46, bids=[], asks=[]))
+    assert abs(detector.mid_delta("m1", 60) - 0.04) < 1e-12
+
+
+def test_update_marks_market_dirty():
+    detector = _detector()
+    assert not detector.dirty
+    detector.update("m1", [], OrderBookView(best_bid=0.40, best_ask=0.42, bids=[], asks=[]))
+    assert detector.dirty == {"m1"}
+
+
+def test_buffered_updates_apply_with_arrival_time():
+    detector = _detector()
+    book = OrderBookView(best_bid=0.40, best_ask=0.42, bids=[], asks=[])
+    received_ns = time.time_ns() - 30_000_000_000
+    pending = deque([("m1", [], book, received_ns), ("m1", [_trade("t1", 0.41, 1.0, 5)], None, received_ns + 1)])
+
+    _apply_updates(detector, pending)
+
+    assert not pending
+    assert detector.dirty == {"m1"}
+    assert len(detector.trade_history["m1"]) == 1
+    # The trade update reuses the last book, stamped when each update arrived.
+    assert detector.book_history["m1"].live_ts().tolist() == [received_ns, received_ns + 1]
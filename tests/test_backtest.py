@@ -0,0 +1,37 @@
+from datetime import datetime, timedelta, timezone
+
+from src.backtest.backtest_runner import backtest, compute_drawdown
+from src.data.storage import FillRecord, SqliteStorage
+
+
+def test_compute_drawdown():
+    assert compute_drawdown([]) == 0.0
+    assert compute_drawdown([0.0, 10.0, -20.0, -10.0]) == 30.0
+
+
+def test_backtest_replays_fills(tmp_path):
+    path = str(tmp_path / "data.sqlite")
+    storage = SqliteStorage(path)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    fills = [(100.0, 10.0), (101.0, 5.0), (99.0, -15.0), (100.0, 5.0), (102.0, 0.0)]
+    for i, (price, size) in enumerate(fills):
+        storage.insert_fill(
+            FillRecord(
+                market="m1",
+                timestamp=start + timedelta(seconds=i),
+                order_id=f"o{i}",
+                price=price,
+                size=size,
+                payload="{}",
+            )
+        )
+    storage.close()
+
+    result = backtest(path, "m1")
+    assert result.total_pnl == -10.0
+    assert result.max_drawdown == 30.0
+    assert result.hit_rate == 0.4
+
+    empty = backtest(path, "missing")
+    assert empty.total_pnl == 0.0
+    assert empty.hit_rate == 0.0
@@ -1,4 +1,6 @@
-from src.config import load_config
+import os
+
+from src.config import _ENV_KEYS, _build_config, load_config
 
 
 def test_load_config_defaults(tmp_path):
@@ -16,3 +18,59 @@ alerts:
     assert config.trading_mode == "simulation"
     assert config.polymarket.rest_base_url == "https://example.com"
     assert config.alerts.discord_webhook_url == "https://example.com/webhook"
+
+
+def test_load_config_reloads_changed_file(tmp_path):
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text("trading_mode: simulation\n")
+    assert load_config(str(config_path)).trading_mode == "simulation"
+
+    config_path.write_text("trading_mode: live\n")
+    stat = config_path.stat()
+    os.utime(config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert load_config(str(config_path)).trading_mode == "live"
+
+
+def test_load_config_caches_parsed_file(tmp_path, monkeypatch):
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text("trading_mode: simulation\n")
+    load_config.cache_clear()
+
+    first = load_config(str(config_path))
+    first.raw["trading_mode"] = "mutated"
+    assert load_config(str(config_path)).raw["trading_mode"] == "simulation"
+    assert load_config.cache_info().hits == 1
+
+    monkeypatch.setenv("TRADING_MODE", "live")
+    assert load_config(str(config_path)).trading_mode == "live"
+
+
+def test_cache_key_covers_every_env_var_read():
+    class _RecordingEnv(dict):
+        def __init__(self) -> None:
+            super().__init__()
+            self.keys_read = set()
+
+        def get(self, key, default=None):
+            self.keys_read.add(key)
+            return super().get(key, default)
+
+    env = _RecordingEnv()
+    _build_config({}, env)
+    assert env.keys_read == set(_ENV_KEYS)
+
+
+def test_load_config_copies_mutable_fields(tmp_path):
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text("allowlist_markets: [m1]\ndetector:\n  volume_windows_sec: [60]\n")
+    load_config.cache_clear()
+
+    first = load_config(str(config_path))
+    first.allowlist_markets.append("m2")
+    first.detector.volume_windows_sec.append(300)
+    first.raw["detector"]["volume_windows_sec"].append(900)
+
+    second = load_config(str(config_path))
+    assert second.allowlist_markets == ["m1"]
+    assert second.detector.volume_windows_sec == [60]
+    assert second.raw["detector"]["volume_windows_sec"] == [60]
@@ -0,0 +1,73 @@
+import time
+
+import orjson
+
+from src.alerts.discord_alerter import DiscordAlerter
+
+
+class _Response:
+    def raise_for_status(self) -> None:
+        pass
+
+
+class _Session:
+    def __init__(self, fail_first: bool = False) -> None:
+        self.bodies = []
+        self.fail_first = fail_first
+
+    def post(self, url, data, headers, timeout):
+        if self.fail_first:
+            self.fail_first = False
+            raise RuntimeError("boom")
+        self.bodies.append(data)
+        return _Response()
+
+
+def test_unencodable_payload_only_drops_itself():
+    alerter = DiscordAlerter("https://example.com/webhook", throttle_sec=0, batch_size=10)
+    alerter.session = _Session()
+    cyclic = {}
+    cyclic["self"] = cyclic
+    alerter.enqueue("BAD", cyclic)
+    alerter.enqueue("OK", {"market": "m1"})
+    alerter.close()
+
+    assert not alerter._worker.is_alive()
+    body = b"".join(alerter.session.bodies)
+    assert b"[OK]" in body
+    assert b"[BAD]" not in body
+
+
+def test_worker_survives_failed_batch():
+    alerter = DiscordAlerter("https://example.com/webhook", throttle_sec=0, batch_size=1)
+    alerter.session = _Session(fail_first=True)
+    alerter.enqueue("FIRST", {})
+    alerter.enqueue("SECOND", {})
+    alerter.close()
+
+    assert len(alerter.session.bodies) == 1
+    assert b"[SECOND]" in alerter.session.bodies[0]
+
+
+def test_payloads_with_non_str_keys_are_sent():
+    alerter = DiscordAlerter("https://example.com/webhook", throttle_sec=0, batch_size=10)
+    alerter.session = _Session()
+    alerter.enqueue("ORDER", {1: "x", "obj": object})
+    alerter.close()
+
+    content = orjson.loads(alerter.session.bodies[0])["content"]
+    assert content == '[ORDER] {"1":"x","obj":"<class \'object\'>"}'
+
+
+def test_close_drains_backlog_without_throttle():
+    alerter = DiscordAlerter("https://example.com/webhook", throttle_sec=60, batch_size=1)
+    alerter.session = _Session()
+    alerter.last_sent = time.time()
+    alerter.enqueue("FIRST", {})
+    alerter.enqueue("SECOND", {})
+    started = time.monotonic()
+    alerter.close()
+
+    assert time.monotonic() - started < 5.0
+    assert not alerter._worker.is_alive()
+    assert [orjson.loads(body)["content"] for body in alerter.session.bodies] == ["[FIRST] {}", "[SECOND] {}"]
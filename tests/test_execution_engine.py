@@ -0,0 +1,48 @@
+import pytest
+
+from src.execution import execution_engine
+from src.execution.execution_engine import ExecutionEngine
+
+
+def _engine(rate_limit_per_minute: int) -> ExecutionEngine:
+    return ExecutionEngine(
+        rest_base_url="https://example.com",
+        api_key=None,
+        api_secret=None,
+        api_passphrase=None,
+        trading_mode="live",
+        rate_limit_per_minute=rate_limit_per_minute,
+        retry_attempts=1,
+        retry_backoff_sec=0.0,
+    )
+
+
+def test_rate_limit_token_bucket(monkeypatch):
+    now = [1000.0]
+    sleeps = []
+
+    def fake_sleep(sec):
+        sleeps.append(sec)
+        now[0] += sec
+
+    monkeypatch.setattr(execution_engine.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(execution_engine.time, "sleep", fake_sleep)
+    engine = _engine(rate_limit_per_minute=2)
+
+    # A full minute's burst goes through without waiting.
+    engine._rate_limit()
+    engine._rate_limit()
+    assert sleeps == []
+
+    # The next token refills at 2/min, i.e. one every 30s.
+    engine._rate_limit()
+    assert sleeps == [pytest.approx(30.0)]
+
+    now[0] += 15
+    engine._rate_limit()
+    assert sleeps[1:] == [pytest.approx(15.0)]
+
+
+def test_rate_limit_must_be_positive():
+    with pytest.raises(ValueError):
+        _engine(rate_limit_per_minute=0)
@@ -0,0 +1,49 @@
+from src.risk import risk_manager
+from src.risk.risk_manager import RiskManager
+
+
+def test_order_rate_limit_slides(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(risk_manager.time, "monotonic", lambda: now[0])
+    risk = RiskManager(
+        max_position_per_market=1000.0,
+        max_global_exposure=1000.0,
+        max_daily_loss=100.0,
+        max_orders_per_minute=2,
+        kill_switch_file=str(tmp_path / "KILL_SWITCH"),
+    )
+
+    risk.record_order()
+    now[0] += 50
+    risk.record_order()
+    assert not risk.check_order("m1", 1.0, 0.5)
+
+    # A fixed window would have reset here; the first order only ages out at +60s.
+    now[0] += 5
+    assert not risk.check_order("m1", 1.0, 0.5)
+    now[0] += 5
+    assert risk.check_order("m1", 1.0, 0.5)
+
+
+def test_kill_switch_check_is_cached(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(risk_manager.time, "monotonic", lambda: now[0])
+    kill_switch = tmp_path / "KILL_SWITCH"
+    risk = RiskManager(10.0, 10.0, 10.0, 10, kill_switch_file=str(kill_switch))
+
+    assert not risk.kill_switch_active()
+    kill_switch.touch()
+    assert not risk.kill_switch_active()
+    now[0] += 1.0
+    assert risk.kill_switch_active()
+
+
+def test_global_exposure_tracks_fills(tmp_path):
+    risk = RiskManager(100.0, 10.0, 100.0, 10, kill_switch_file=str(tmp_path / "KILL_SWITCH"))
+    risk.record_fill("m1", 4.0, 0.5, 0.0)
+    risk.record_fill("m2", -5.0, 0.5, 0.0)
+    assert risk.state.total_abs_position == 9.0
+    assert not risk.check_order("m3", 2.0, 0.5)
+    risk.record_fill("m2", 3.0, 0.5, 0.0)
+    assert risk.state.total_abs_position == 6.0
+    assert risk.check_order("m3", 2.0, 0.5)
@@ -0,0 +1,128 @@
+import sqlite3
+from collections import deque
+from datetime import datetime, timezone
+
+from src.data import storage as storage_module
+from src.data.storage import OrderBookSnapshot, SqliteStorage, Trade
+from src.main import _drain
+
+
+def _trade(trade_id: str) -> Trade:
+    return Trade(
+        market="m1",
+        trade_id=trade_id,
+        price=0.5,
+        size=10.0,
+        side="buy",
+        timestamp=datetime(2024, 1, 1, tzinfo=timezone.utc),
+    )
+
+
+def test_insert_trades_counts_new_rows(tmp_path):
+    storage = SqliteStorage(str(tmp_path / "data.sqlite"))
+    assert storage.insert_trades([_trade("t1"), _trade("t2")]) == 2
+    assert storage.insert_trades([_trade("t2"), _trade("t3")]) == 1
+    assert storage.insert_trades([]) == 0
+    assert [row["trade_id"] for row in storage.fetch_trades("m1")] == ["t1", "t2", "t3"]
+    storage.close()
+
+
+def test_fetch_trades_since_accepts_iso_or_epoch(tmp_path):
+    storage = SqliteStorage(str(tmp_path / "data.sqlite"))
+    early = _trade("t1")
+    late = _trade("t2")
+    late.timestamp = datetime(2024, 1, 2, tzinfo=timezone.utc)
+    storage.insert_trades([early, late])
+
+    rows = list(storage.fetch_trades("m1", since="2024-01-01T12:00:00Z"))
+    assert [row["trade_id"] for row in rows] == ["t2"]
+    assert rows[0]["timestamp"] == 1704153600000000
+    assert [row["trade_id"] for row in storage.fetch_trades("m1", since=1704153600000000)] == ["t2"]
+    storage.close()
+
+
+def test_insert_orderbooks_batches_snapshots(tmp_path):
+    storage = SqliteStorage(str(tmp_path / "data.sqlite"))
+    snapshots = [
+        OrderBookSnapshot(
+            market="m1",
+            timestamp=datetime(2024, 1, 1, tzinfo=timezone.utc),
+            bids="[[0.49,10.0]]",
+            asks="[[0.51,5.0]]",
+        )
+        for _ in range(3)
+    ]
+    assert storage.insert_orderbooks(snapshots) == 3
+    storage.close()
+
+
+def test_insert_trades_skips_only_failing_rows(tmp_path):
+    storage = SqliteStorage(str(tmp_path / "data.sqlite"))
+    bad = _trade("t2")
+    bad.price = [0.5]
+    assert storage.insert_trades([_trade("t1"), bad, _trade("t3")]) == 2
+    assert [row["trade_id"] for row in storage.fetch_trades("m1")] == ["t1", "t3"]
+    # The savepoint must not commit on its own; commits stay batched.
+    assert storage.connection.in_transaction
+    storage.close()
+
+
+def test_flush_commits_after_interval_without_new_writes(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(storage_module.time, "monotonic", lambda: now[0])
+    path = str(tmp_path / "data.sqlite")
+    storage = SqliteStorage(path, commit_interval_sec=1.0)
+    storage.insert_trades([_trade("t1")])
+    reader = sqlite3.connect(path)
+    assert reader.execute("SELECT COUNT(*) FROM trades").fetchone()[0] == 0
+
+    storage.flush()
+    assert reader.execute("SELECT COUNT(*) FROM trades").fetchone()[0] == 0
+    now[0] += 1.0
+    storage.flush()
+    assert reader.execute("SELECT COUNT(*) FROM trades").fetchone()[0] == 1
+    reader.close()
+    storage.close()
+
+
+def test_locked_database_keeps_batch_for_retry(tmp_path):
+    path = str(tmp_path / "data.sqlite")
+    storage = SqliteStorage(path)
+    storage.connection.execute("PRAGMA busy_timeout=0")
+    other = sqlite3.connect(path)
+    other.execute("BEGIN IMMEDIATE")
+    pending = deque([_trade("t1"), _trade("t2"), _trade("t3")])
+
+    _drain(pending, storage.insert_trades)
+    assert [trade.trade_id for trade in pending] == ["t1", "t2", "t3"]
+
+    other.rollback()
+    other.close()
+    _drain(pending, storage.insert_trades)
+    assert not pending
+    assert [row["trade_id"] for row in storage.fetch_trades("m1")] == ["t1", "t2", "t3"]
+    storage.close()
+
+
+def test_text_timestamp_tables_are_migrated(tmp_path):
+    path = str(tmp_path / "data.sqlite")
+    legacy = sqlite3.connect(path)
+    legacy.execute(
+        "CREATE TABLE fills (market TEXT, timestamp TEXT, order_id TEXT, price REAL, size REAL, payload TEXT)"
+    )
+    legacy.executemany(
+        "INSERT INTO fills VALUES (?, ?, ?, ?, ?, ?)",
+        [
+            ("m1", "2024-01-01T00:00:00+00:00", "o1", 0.5, 1.0, "{}"),
+            ("m1", "1735689600000000", "o2", 0.6, 1.0, "{}"),
+        ],
+    )
+    legacy.commit()
+    legacy.close()
+
+    storage = SqliteStorage(path)
+    rows = storage.connection.execute(
+        "SELECT order_id, timestamp, typeof(timestamp) FROM fills ORDER BY timestamp"
+    ).fetchall()
+    assert rows == [("o1", 1704067200000000, "integer"), ("o2", 1735689600000000, "integer")]
+    storage.close()
@@ -1,4 +1,5 @@
-from src.strategy.fade_strategy import FadeStrategy
+from src.config import StrategyConfig
+from src.strategy.fade_strategy import FadeStrategy, FeaturesView
 
 def test_fade_strategy_atr_logic():
     strategy = FadeStrategy(
@@ -50,3 +51,92 @@ def test_fade_strategy_buy_signal():
     signal = strategy.generate_signal(market, 99.0, -1.0, 0.8, features, 10)
     assert signal.side == "buy"
     assert signal.price > 99.0 # Positive offset for buy
+
+def test_fade_strategy_reload_keeps_atr_history():
+    strategy = FadeStrategy(
+        anomaly_threshold=0.7,
+        min_impact_per_volume=0.01,
+        take_profit_bps=50,
+        stop_loss_bps=30,
+        time_stop_min=10,
+        atr_window=5
+    )
+    features = {"impact_per_volume": 0.005}
+    strategy.generate_signal("m", 100.0, 1.0, 0.8, features, 10)
+
+    strategy.reload(StrategyConfig(
+        anomaly_threshold=0.9,
+        min_impact_per_volume=0.01,
+        take_profit_bps=50,
+        stop_loss_bps=30,
+        time_stop_min=10,
+        atr_window=5,
+    ))
+    assert strategy.generate_signal("m", 101.0, 1.0, 0.8, features, 10) is None
+    signal = strategy.generate_signal("m", 102.0, 1.0, 0.95, features, 10)
+    assert signal.features["atr"] == 1.0
+
+def test_fade_strategy_reuses_released_signals():
+    strategy = FadeStrategy(
+        anomaly_threshold=0.7,
+        min_impact_per_volume=0.01,
+        take_profit_bps=50,
+        stop_loss_bps=30,
+        time_stop_min=10
+    )
+    features = {"impact_per_volume": 0.005}
+    first = strategy.generate_signal("m", 100.0, 1.0, 0.8, features, 10)
+    strategy.release(first)
+
+    second = strategy.generate_signal("m", 99.0, -1.0, 0.8, features, 5)
+    assert second is first
+    assert second.side == "buy"
+    assert second.size == 5
+
+def test_generate_signals_batch_matches_single_calls():
+    def make():
+        return FadeStrategy(
+            anomaly_threshold=0.7,
+            min_impact_per_volume=0.01,
+            take_profit_bps=50,
+            stop_loss_bps=30,
+            time_stop_min=10,
+            atr_window=3
+        )
+
+    single, batch = make(), make()
+    markets = ["a", "b", "c"]
+    ticks = [
+        ([100.0, 50.0, 20.0], [1.0, -1.0, 0.0], [0.8, 0.5, 0.9], [0.005, 0.005, 0.005]),
+        ([101.0, 49.0, 21.0], [1.0, -1.0, 1.0], [0.8, 0.8, 0.9], [0.005, 0.005, 0.02]),
+        ([103.0, 48.5, 22.0], [1.0, -1.0, -1.0], [0.9, 0.8, 0.9], [0.005, 0.005, 0.005]),
+    ]
+    for mids, moves, scores, ipvs in ticks:
+        result = batch.generate_signals_batch(markets, mids, moves, scores, ipvs)
+        expected = []
+        for i, market in enumerate(markets):
+            signal = single.generate_signal(
+                market, mids[i], moves[i], scores[i], {"impact_per_volume": ipvs[i]}, 10
+            )
+            if signal:
+                expected.append((i, signal.side, signal.price, signal.features["tp_price"], signal.features["sl_price"]))
+        got = list(zip(
+            result.index.tolist(),
+            result.side.tolist(),
+            result.price.tolist(),
+            result.tp_price.tolist(),
+            result.sl_price.tolist(),
+        ))
+        assert got == expected
+
+def test_fade_strategy_accepts_features_view():
+    strategy = FadeStrategy(
+        anomaly_threshold=0.7,
+        min_impact_per_volume=0.01,
+        take_profit_bps=50,
+        stop_loss_bps=30,
+        time_stop_min=10
+    )
+    assert strategy.generate_signal("m", 100.0, 1.0, 0.8, FeaturesView(impact_per_volume=0.02), 10) is None
+    signal = strategy.generate_signal("m", 101.0, 1.0, 0.8, FeaturesView(impact_per_volume=0.005), 10)
+    assert signal.side == "sell"
@@ -0,0 +1,49 @@
+import base64
+
+import orjson
+import pytest
+
+from src.execution import wallet_signer
+from src.execution.wallet_signer import PrivateKeyEnvSigner
+
+SEED_HEX = "11" * 32
+PAYLOAD = {"market": "m1", "side": "buy", "price": 0.42, "size": 10.0, "type": "limit"}
+
+
+def _reference_headers():
+    signing = pytest.importorskip("nacl.signing")
+    key = signing.SigningKey(bytes.fromhex(SEED_HEX))
+    message = orjson.dumps(PAYLOAD, option=orjson.OPT_SORT_KEYS)
+    return {
+        "X-WALLET-SIGNATURE": base64.b64encode(key.sign(message).signature).decode("ascii"),
+        "X-WALLET-PUBLIC-KEY": key.verify_key.encode().hex(),
+    }
+
+
+def test_cryptography_backend_matches_pynacl():
+    ed25519 = pytest.importorskip("cryptography.hazmat.primitives.asymmetric.ed25519")
+    expected = _reference_headers()
+    assert wallet_signer.Ed25519PrivateKey is ed25519.Ed25519PrivateKey
+
+    assert PrivateKeyEnvSigner("0x" + SEED_HEX).sign(PAYLOAD).headers == expected
+
+
+def test_pynacl_backend_matches_reference(monkeypatch):
+    expected = _reference_headers()
+    signing = pytest.importorskip("nacl.signing")
+    monkeypatch.setattr(wallet_signer, "Ed25519PrivateKey", None)
+    monkeypatch.setattr(wallet_signer, "SigningKey", signing.SigningKey, raising=False)
+
+    assert PrivateKeyEnvSigner("0x" + SEED_HEX).sign(PAYLOAD).headers == expected
+
+
+def test_mutated_headers_do_not_leak_into_cache():
+    signer = PrivateKeyEnvSigner("0x" + SEED_HEX)
+    first = signer.sign(PAYLOAD).headers
+    expected = dict(first)
+    first["X-WALLET-SIGNATURE"] = "tampered"
+    first["X-EXTRA"] = "1"
+
+    second = signer.sign(PAYLOAD).headers
+    assert second == expected
+    assert second is not first